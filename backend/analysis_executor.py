@@ -0,0 +1,193 @@
+"""
+QOFA Analysis Executor
+Runs CPU-bound analysis off the asyncio event loop with bounded queueing
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+import logging
+
+import qofa_metrics
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Analysis executor is saturated")
+        self.retry_after = retry_after
+
+
+class AnalysisTimeoutError(Exception):
+    """Raised when a job does not finish within the per-job timeout"""
+
+
+class AnalysisExecutor:
+    """
+    Bounded executor for CPU-bound QOFA analysis
+
+    kind='process' isolates analysis in worker processes; kind='thread' is
+    cheaper and sufficient when the work is dominated by GIL-releasing BLAS /
+    LAPACK calls. At most max_workers jobs run and max_queue more may wait;
+    further submissions are rejected with ExecutorSaturatedError so callers
+    can apply back-pressure instead of stalling the event loop.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None,
+                 max_queue: int = 32, timeout: float = 30.0,
+                 initializer: Optional[Callable[[], Any]] = None):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+        self.logger = logging.getLogger(__name__)
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._timed_out = 0
+        # Submitted jobs whose done-callback has not run yet, and those of them
+        # already counted as timed_out, whose late finish is not counted again
+        self._pending: Set[Future] = set()
+        self._abandoned: Set[Future] = set()
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable[[], Any]] = None) -> "AnalysisExecutor":
+        """Configure from QOFA_EXECUTOR_* environment variables"""
+        workers = os.environ.get("QOFA_EXECUTOR_WORKERS")
+        return cls(
+            kind=os.environ.get("QOFA_EXECUTOR_KIND", "process"),
+            max_workers=int(workers) if workers else None,
+            max_queue=int(os.environ.get("QOFA_EXECUTOR_MAX_QUEUE", 32)),
+            timeout=float(os.environ.get("QOFA_EXECUTOR_TIMEOUT", 30)),
+            initializer=initializer
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn keeps workers free of the server's event loop and Mongo client state
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=self.initializer)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="qofa-analysis",
+                                                initializer=self.initializer)
+        return self._pool
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+            self._pending.discard(future)
+            if future in self._abandoned:
+                # Already counted as timed_out
+                self._abandoned.discard(future)
+                return
+            if future.cancelled():
+                outcome = "cancelled"
+                self._cancelled += 1
+            elif future.exception() is not None:
+                outcome = "failed"
+                self._failed += 1
+            else:
+                outcome = "completed"
+                self._completed += 1
+        if qofa_metrics.ENABLED:
+            qofa_metrics.EXECUTOR_JOBS.inc(outcome=outcome)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run fn(*args) on the pool, raising ExecutorSaturatedError or AnalysisTimeoutError"""
+        with self._lock:
+            saturated = self._in_flight >= self.capacity
+            if saturated:
+                self._rejected += 1
+            else:
+                self._in_flight += 1
+        if saturated:
+            if qofa_metrics.ENABLED:
+                qofa_metrics.EXECUTOR_JOBS.inc(outcome="rejected")
+            raise ExecutorSaturatedError(retry_after=max(1.0, self.timeout / 10))
+
+        # Worker processes hand their metric samples back with the result
+        drain_metrics = self.kind == "process" and qofa_metrics.ENABLED
+        try:
+            if drain_metrics:
+                future = self._get_pool().submit(qofa_metrics.call_and_drain, fn, *args)
+            else:
+                future = self._get_pool().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        # The slot is freed when the job actually finishes, not when the caller gives up
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._release)
+        wrapped = asyncio.wrap_future(future)
+        try:
+            # asyncio.wait leaves the job alone on timeout, so it is marked abandoned before cancelling
+            await asyncio.wait({wrapped}, timeout=timeout or self.timeout)
+        except asyncio.CancelledError:
+            wrapped.cancel()
+            raise
+        if not wrapped.done():
+            with self._lock:
+                abandoned = future in self._pending
+                if abandoned:
+                    self._abandoned.add(future)
+                    self._timed_out += 1
+            wrapped.cancel()
+            if abandoned:
+                if qofa_metrics.ENABLED:
+                    qofa_metrics.EXECUTOR_JOBS.inc(outcome="timed_out")
+                raise AnalysisTimeoutError(f"Analysis did not finish within {timeout or self.timeout:g}s")
+            # Finished right at the deadline and already counted by _release
+            result = future.result()
+        else:
+            result = wrapped.result()
+
+        if drain_metrics:
+            result, samples = result
+            qofa_metrics.REGISTRY.merge(samples or {})
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": min(in_flight, self.max_workers),
+                "queued": max(0, in_flight - self.max_workers),
+                "utilization": min(in_flight, self.max_workers) / self.max_workers,
+                "saturated": in_flight >= self.capacity,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out
+            }
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
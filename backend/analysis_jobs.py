@@ -0,0 +1,134 @@
+"""
+QOFA Analysis Jobs
+CPU-bound analysis entry points that run inside executor workers
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from qofa_core import QuantumOptionsFlowAnalyzer, QuantumAnalysisContext, RiskInputs
+
+
+# One analyzer per worker thread; analyzers keep per-call state such as entanglement_matrix
+_local = threading.local()
+
+
+def get_analyzer() -> QuantumOptionsFlowAnalyzer:
+    analyzer = getattr(_local, 'analyzer', None)
+    if analyzer is None:
+        analyzer = _local.analyzer = QuantumOptionsFlowAnalyzer()
+    return analyzer
+
+
+def warm_up():
+    """Executor initializer: build the analyzer and attach persisted basis tables"""
+    get_analyzer().basis_provider.preload()
+
+
+def _market_frame(symbol: str, price_data: np.ndarray, volume_data: np.ndarray,
+                  timestamp: datetime) -> pd.DataFrame:
+    price_data = np.asarray(price_data, dtype=float)
+    return pd.DataFrame({
+        'symbol': symbol,  # Scalars are broadcast by pandas, no per-row Python lists
+        'price': price_data,
+        'volume': np.asarray(volume_data, dtype=float),
+        'strike': price_data,  # Simplified for demo
+        'timestamp': timestamp
+    }, index=pd.RangeIndex(len(price_data)))
+
+
+def _flow_result(context: QuantumAnalysisContext) -> Dict:
+    return {
+        'signals': context.trading_signals,
+        'confidence': context.confidence,
+        'quantum_metrics': context.quantum_metrics
+    }
+
+
+def analyze_quantum_flow(symbol: str, price_data: np.ndarray, volume_data: np.ndarray,
+                         timestamp: datetime) -> Dict:
+    """Quantum options flow analysis for a single symbol"""
+    market_df = _market_frame(symbol, price_data, volume_data, timestamp)
+    return _flow_result(QuantumAnalysisContext(get_analyzer(), market_df))
+
+
+def analyze_quantum_flow_batch(items: List[Tuple[str, np.ndarray, np.ndarray, datetime]]
+                               ) -> List[Tuple[str, Dict]]:
+    """Quantum options flow analysis for many symbols through the batched field operator"""
+    frames = [_market_frame(*item) for item in items]
+    contexts = QuantumAnalysisContext.batch(get_analyzer(), frames)
+    return [(item[0], _flow_result(context)) for item, context in zip(items, contexts)]
+
+
+def _entanglement_sample_data(symbols: List[str], seeds: List[int]) -> Dict[str, np.ndarray]:
+    """
+    Sample market data for entanglement analysis
+
+    Seeds are derived by the caller so sample data does not depend on the
+    worker's hash randomization.
+    """
+    market_data = {}
+    for symbol, seed in zip(symbols, seeds):
+        # Generate realistic sample data
+        rng = np.random.RandomState(seed)
+        prices = rng.normal(100, 15, 100)
+        volumes = rng.exponential(1000, 100)
+        market_data[symbol] = prices + volumes * 0.01  # Simple correlation
+    return market_data
+
+
+def analyze_entanglement(symbols: List[str], seeds: List[int]) -> Tuple[float, np.ndarray]:
+    """Entanglement entropy and composite state matrix for sample data of the given symbols"""
+    analyzer = get_analyzer()
+    entanglement_entropy = analyzer.entanglement_detection(_entanglement_sample_data(symbols, seeds))
+    return float(entanglement_entropy), analyzer.entanglement_matrix
+
+
+def analyze_entanglement_series(symbols: List[str], seeds: List[int], window: int, step: int) -> np.ndarray:
+    """Rolling-window entanglement entropy for sample data of the given symbols"""
+    return get_analyzer().rolling_entanglement_entropy(_entanglement_sample_data(symbols, seeds), window, step)
+
+
+def analyze_options_chain(options_data: List[Dict], time_steps: int = 100) -> List[Dict]:
+    """
+    Energy levels and evolved strike probabilities for every expiry of a chain
+
+    All expiries are built and solved as one batch; rows without an
+    expiration form a single expiry. Each expiry's strikes are sorted and
+    rows sharing a strike (calls and puts) are merged into one.
+    """
+    chain = pd.DataFrame(options_data)
+    chain['expiration'] = chain['expiration'].fillna('') if 'expiration' in chain else ''
+
+    analyzer = get_analyzer()
+    hamiltonian = analyzer.quantum_options_hamiltonian_batch(chain)
+    states, eigenvalues = analyzer.solve_schrodinger_batch(hamiltonian, time_steps=time_steps)
+
+    results = []
+    for k, expiration in enumerate(hamiltonian.expiries):
+        size = hamiltonian.sizes[k]
+        results.append({
+            'expiration': expiration,
+            'strikes': hamiltonian.strikes[k, :size].tolist(),
+            'energy_levels': eigenvalues[k, :size].tolist(),
+            'probabilities': (np.abs(states[k, :size])**2).tolist()
+        })
+    return results
+
+
+def assess_risk(portfolio: Dict[str, float], market_conditions: Dict[str, float],
+                entanglement_matrix: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """Quantum risk assessment against the caller's latest entanglement matrix"""
+    analyzer = get_analyzer()
+    analyzer.entanglement_matrix = entanglement_matrix
+    return analyzer.quantum_risk_assessment(portfolio, market_conditions)
+
+
+def assess_risk_arrays(inputs: RiskInputs, entanglement_matrix: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """Quantum risk assessment of array-form inputs against the caller's latest entanglement matrix"""
+    analyzer = get_analyzer()
+    analyzer.entanglement_matrix = entanglement_matrix
+    return analyzer.quantum_risk_assessment_arrays(inputs)
@@ -0,0 +1,373 @@
+"""
+Covariance Store for QOFA
+Incrementally updated EWMA volatility / covariance estimates per symbol universe
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+UNIVERSE_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def naive_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    """Bar timestamps are compared as naive UTC; aware values are converted"""
+    if timestamp is None or timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class EWMACovariance:
+    """
+    RiskMetrics-style exponentially weighted covariance of log returns
+
+        Σ_t = λ Σ_{t-1} + (1 - λ) r_t r_tᵀ
+
+    Each bar is a single rank-1 update, O(n²), with no recompute from
+    history. Σ starts from a prior of default_volatility and zero
+    correlation whose weight decays as λ^t; symbols first seen in a later
+    bar join with the same prior. A symbol missing from a bar, or seen for
+    the first time, contributes a zero return to it.
+
+    Arrays are allocated with spare capacity so a growing universe is not
+    copied on every new symbol.
+    """
+
+    def __init__(self, decay: float = 0.94, bars_per_year: float = 252,
+                 default_volatility: float = 0.2):
+        if not 0 < decay < 1:
+            raise ValueError("decay must lie in (0, 1)")
+        self.decay = decay
+        self.bars_per_year = bars_per_year
+        self.default_volatility = default_volatility
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._covariance = np.zeros((0, 0))
+        self._last_prices = np.zeros(0)
+        self._observations = np.zeros(0, dtype=np.int64)
+        self.bars = 0
+        self.updated_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def prior_variance(self) -> float:
+        """Per-bar variance implied by default_volatility"""
+        return self.default_volatility**2 / self.bars_per_year
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Per-bar covariance of the current universe (a view)"""
+        n = len(self.symbols)
+        return self._covariance[:n, :n]
+
+    def add_symbols(self, symbols: Iterable[str]):
+        new_symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.index]
+        if not new_symbols:
+            return
+        n, n_new = len(self.symbols), len(self.symbols) + len(new_symbols)
+        capacity = len(self._last_prices)
+        if n_new > capacity:
+            capacity = max(n_new, 2 * capacity)
+            covariance = np.zeros((capacity, capacity))
+            covariance[:n, :n] = self._covariance[:n, :n]
+            last_prices = np.full(capacity, np.nan)
+            last_prices[:n] = self._last_prices[:n]
+            observations = np.zeros(capacity, dtype=np.int64)
+            observations[:n] = self._observations[:n]
+            self._covariance, self._last_prices, self._observations = covariance, last_prices, observations
+
+        self._covariance[n:n_new, :n_new] = 0.0
+        self._covariance[:n_new, n:n_new] = 0.0
+        self._covariance[np.arange(n, n_new), np.arange(n, n_new)] = self.prior_variance
+        self._last_prices[n:n_new] = np.nan
+        self._observations[n:n_new] = 0
+        for i, symbol in enumerate(new_symbols, n):
+            self.index[symbol] = i
+        self.symbols.extend(new_symbols)
+
+    def update(self, prices: Dict[str, float], timestamp: Optional[datetime] = None):
+        """Fold one bar of closing prices into the estimate"""
+        timestamp = naive_utc(timestamp)
+        if timestamp is not None and self.updated_at is not None and timestamp <= self.updated_at:
+            raise ValueError(f"bar at {timestamp.isoformat()} is not newer than the last update "
+                             f"at {self.updated_at.isoformat()}")
+        values = np.fromiter(prices.values(), dtype=float, count=len(prices))
+        if not np.all(np.isfinite(values) & (values > 0)):
+            raise ValueError("prices must be positive and finite")
+
+        self.add_symbols(prices)
+        indices = np.fromiter((self.index[symbol] for symbol in prices), dtype=np.intp, count=len(prices))
+        last_prices = self._last_prices[indices]
+        seen = ~np.isnan(last_prices)
+
+        returns = np.zeros(len(self.symbols))
+        returns[indices[seen]] = np.log(values[seen] / last_prices[seen])
+        self._last_prices[indices] = values
+        self._observations[indices[seen]] += 1
+
+        covariance = self.covariance
+        covariance *= self.decay
+        covariance += (1 - self.decay) * np.outer(returns, returns)
+        self.bars += 1
+        self.updated_at = timestamp or datetime.utcnow()
+
+    def lookup(self, symbols: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Annualized volatilities and the correlation matrix of any subset
+
+        Symbols are located through the index dict, so the cost depends on
+        the subset, not the universe. Unknown symbols get default_volatility
+        and zero correlation; the third array flags the known ones.
+        """
+        positions = np.fromiter((self.index.get(symbol, -1) for symbol in symbols),
+                                dtype=np.intp, count=len(symbols))
+        known = positions >= 0
+        rows = positions[known]
+
+        volatilities = np.full(len(symbols), self.default_volatility)
+        correlation = np.eye(len(symbols))
+        if rows.size:
+            covariance = self._covariance[np.ix_(rows, rows)]
+            std = np.sqrt(np.diag(covariance))
+            volatilities[known] = std * np.sqrt(self.bars_per_year)
+            known_correlation = np.clip(covariance / np.outer(std, std), -1.0, 1.0)
+            np.fill_diagonal(known_correlation, 1.0)
+            correlation[np.ix_(known, known)] = known_correlation
+        return volatilities, correlation, known
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Snapshot as plain arrays; the covariance is stored as its packed upper triangle"""
+        n = len(self.symbols)
+        return {
+            "symbols": np.array(self.symbols, dtype=str),
+            "covariance": self.covariance[np.triu_indices(n)],
+            "last_prices": self._last_prices[:n].copy(),
+            "observations": self._observations[:n].copy(),
+            "parameters": np.array([self.decay, self.bars_per_year, self.default_volatility]),
+            "bars": np.array(self.bars),
+            "updated_at": np.array(self.updated_at.isoformat() if self.updated_at else "")
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "EWMACovariance":
+        decay, bars_per_year, default_volatility = (float(value) for value in arrays["parameters"])
+        estimator = cls(decay, bars_per_year, default_volatility)
+        symbols = [str(symbol) for symbol in arrays["symbols"]]
+        estimator.add_symbols(symbols)
+        n = len(symbols)
+
+        covariance = np.zeros((n, n))
+        covariance[np.triu_indices(n)] = arrays["covariance"]
+        estimator.covariance[:] = covariance + np.triu(covariance, 1).T
+        estimator._last_prices[:n] = arrays["last_prices"]
+        estimator._observations[:n] = arrays["observations"]
+        estimator.bars = int(arrays["bars"])
+        updated_at = str(arrays["updated_at"])
+        estimator.updated_at = datetime.fromisoformat(updated_at) if updated_at else None
+        return estimator
+
+    def stats(self) -> Dict:
+        return {
+            "symbols": len(self.symbols),
+            "bars": self.bars,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "decay": self.decay
+        }
+
+
+class CovarianceStore:
+    """
+    EWMA estimators per named symbol universe, snapshotted to disk and/or Mongo
+
+    Snapshots are written every snapshot_interval seconds for universes that
+    changed since the last one, and on stop(). On disk each universe is an
+    .npz file written through a temporary file; in Mongo it is one document
+    per universe holding the packed arrays as bytes (MongoDB's 16 MB document
+    limit caps Mongo snapshots at roughly 2,000 symbols; use snapshot_dir
+    beyond that). load() prefers the Mongo copy when both exist.
+
+    update_many may run on a worker thread: each bar is applied under a lock
+    that lookups and snapshots also take, so readers wait for at most one bar.
+    """
+
+    def __init__(self, decay: float = 0.94, bars_per_year: float = 252, default_volatility: float = 0.2,
+                 snapshot_dir: Optional[str] = None, collection=None, snapshot_interval: float = 60.0):
+        self.decay = decay
+        self.bars_per_year = bars_per_year
+        self.default_volatility = default_volatility
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.collection = collection
+        self.snapshot_interval = snapshot_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.universes: Dict[str, EWMACovariance] = {}
+        self._dirty: set = set()
+        self._snapshot_lock = asyncio.Lock()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.snapshots = 0
+
+    @staticmethod
+    def check_name(universe: str) -> str:
+        if not UNIVERSE_NAME.match(universe):
+            raise ValueError("universe names are 1-64 characters of letters, digits, '_', '.' or '-'")
+        return universe
+
+    def universe(self, universe: str) -> EWMACovariance:
+        estimator = self.universes.get(universe)
+        if estimator is None:
+            estimator = self.universes[self.check_name(universe)] = EWMACovariance(
+                self.decay, self.bars_per_year, self.default_volatility
+            )
+        return estimator
+
+    def update(self, universe: str, prices: Dict[str, float], timestamp: Optional[datetime] = None):
+        self.update_many(universe, [(prices, timestamp)])
+
+    def update_many(self, universe: str, bars: Iterable[Tuple[Dict[str, float], Optional[datetime]]]) -> int:
+        """
+        Apply (prices, timestamp) bars in order; returns how many were applied
+
+        A refused bar raises ValueError naming its position; bars before it
+        stay applied.
+        """
+        applied = 0
+        try:
+            for prices, timestamp in bars:
+                with self._lock:
+                    self.universe(universe).update(prices, timestamp)
+                    self._dirty.add(universe)
+                applied += 1
+        except ValueError as e:
+            raise ValueError(f"Bar {applied}: {e}") from e
+        return applied
+
+    def lookup(self, universe: str, symbols: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with self._lock:
+            estimator = self.universes.get(universe)
+            if estimator is not None:
+                return estimator.lookup(symbols)
+        # An unknown universe answers with the prior, without creating it
+        return EWMACovariance(self.decay, self.bars_per_year, self.default_volatility).lookup(symbols)
+
+    def _path(self, universe: str) -> Path:
+        return self.snapshot_dir / f"covariance_{universe}.npz"
+
+    def _save_file(self, universe: str, arrays: Dict[str, np.ndarray]):
+        path = self._path(universe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        tmp_path.replace(path)
+
+    def _load_files(self) -> Dict[str, EWMACovariance]:
+        loaded = {}
+        if self.snapshot_dir is None or not self.snapshot_dir.exists():
+            return loaded
+        for path in self.snapshot_dir.glob("covariance_*.npz"):
+            universe = path.stem[len("covariance_"):]
+            try:
+                with np.load(path) as arrays:
+                    loaded[universe] = EWMACovariance.from_arrays(dict(arrays))
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Ignoring unreadable covariance snapshot {path}: {e}")
+        return loaded
+
+    @staticmethod
+    def _to_document(universe: str, arrays: Dict[str, np.ndarray]) -> Dict:
+        return {
+            "_id": universe,
+            "symbols": arrays["symbols"].tolist(),
+            "covariance": arrays["covariance"].astype("<f8").tobytes(),
+            "last_prices": arrays["last_prices"].astype("<f8").tobytes(),
+            "observations": arrays["observations"].astype("<i8").tobytes(),
+            "parameters": arrays["parameters"].tolist(),
+            "bars": int(arrays["bars"]),
+            "updated_at": str(arrays["updated_at"]),
+            "snapshot_at": datetime.utcnow()
+        }
+
+    @staticmethod
+    def _from_document(document: Dict) -> EWMACovariance:
+        return EWMACovariance.from_arrays({
+            "symbols": np.array(document["symbols"], dtype=str),
+            "covariance": np.frombuffer(bytes(document["covariance"]), dtype="<f8"),
+            "last_prices": np.frombuffer(bytes(document["last_prices"]), dtype="<f8"),
+            "observations": np.frombuffer(bytes(document["observations"]), dtype="<i8"),
+            "parameters": np.array(document["parameters"]),
+            "bars": np.array(document["bars"]),
+            "updated_at": np.array(document["updated_at"])
+        })
+
+    async def load(self) -> int:
+        """Restore universes from the latest snapshots; returns how many were restored"""
+        loaded = await asyncio.to_thread(self._load_files)
+        if self.collection is not None:
+            try:
+                async for document in self.collection.find({}):
+                    loaded[document["_id"]] = self._from_document(document)
+            except Exception as e:
+                self.logger.error(f"Could not load covariance snapshots from Mongo: {e}")
+        self.universes.update(loaded)
+        return len(loaded)
+
+    async def snapshot(self, universes: Optional[Iterable[str]] = None):
+        """Persist the given universes, by default every one changed since the last snapshot"""
+        async with self._snapshot_lock:
+            with self._lock:
+                names = list(universes) if universes is not None else list(self._dirty)
+            for universe in names:
+                with self._lock:
+                    self._dirty.discard(universe)
+                    arrays = self.universes[universe].to_arrays()
+                try:
+                    if self.snapshot_dir is not None:
+                        await asyncio.to_thread(self._save_file, universe, arrays)
+                    if self.collection is not None:
+                        await self.collection.replace_one({"_id": universe},
+                                                          self._to_document(universe, arrays), upsert=True)
+                except Exception as e:
+                    self.logger.error(f"Covariance snapshot of universe {universe!r} failed: {e}")
+                    with self._lock:
+                        self._dirty.add(universe)
+                    continue
+                self.snapshots += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.snapshot()
+
+    def start(self):
+        if self._task is None and (self.snapshot_dir is not None or self.collection is not None):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.snapshot_dir is not None or self.collection is not None:
+            await self.snapshot()
+
+    def stats(self) -> Dict:
+        return {
+            "universes": {name: estimator.stats() for name, estimator in self.universes.items()},
+            "pending_snapshots": len(self._dirty),
+            "snapshots": self.snapshots
+        }
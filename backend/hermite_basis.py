@@ -0,0 +1,150 @@
+"""
+Hermite Basis Provider for QOFA
+Generates, caches and persists quantum harmonic oscillator basis tables
+"""
+
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+import os
+import threading
+
+
+class HermiteBasisProvider:
+    """
+    Shared provider of (n_basis × N) Hermite function tables
+
+    φ_0(x) = π^(-1/4) exp(-x²/2)
+    φ_1(x) = √2 x φ_0(x)
+    φ_{n+1}(x) = √(2/(n+1)) x φ_n(x) - √(n/(n+1)) φ_{n-1}(x)
+
+    The functions are sampled on N points spanning the classical turning
+    points ±√(2 n_basis + 1) of the highest state, so every row covers the
+    whole series. Tables are kept in an LRU cache bounded by max_bytes and
+    are read-only so that analyzer instances can share them. When cache_dir
+    is set, tables are persisted as .npy files and memory-mapped on reuse,
+    which lets worker processes attach without recomputing.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.logger = logging.getLogger(__name__)
+
+        self._tables: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def generate(n_basis: int, n_points: int) -> np.ndarray:
+        """Evaluate the first n_basis Hermite functions with the three-term recurrence"""
+        basis = np.zeros((n_basis, n_points))
+        if n_basis == 0 or n_points == 0:
+            return basis
+
+        turning_point = np.sqrt(2 * n_basis + 1)
+        x = np.linspace(-turning_point, turning_point, n_points)
+
+        basis[0] = np.pi**-0.25 * np.exp(-0.5 * x**2)
+        if n_basis > 1:
+            basis[1] = np.sqrt(2.0) * x * basis[0]
+        for n in range(1, n_basis - 1):
+            basis[n + 1] = np.sqrt(2.0 / (n + 1)) * x * basis[n] - \
+                np.sqrt(n / (n + 1)) * basis[n - 1]
+        return basis
+
+    def get(self, n_basis: int, n_points: int) -> np.ndarray:
+        """Return the cached (n_basis × n_points) table, building it on a miss"""
+        key = (n_basis, n_points)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+
+        table = self._load(key)
+        if table is None:
+            table = self.generate(n_basis, n_points)
+            table.setflags(write=False)
+            self._persist(key, table)
+
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = table
+                self._bytes += table.nbytes
+                self._evict()
+            return self._tables[key]
+
+    def preload(self) -> int:
+        """Memory-map every persisted table in cache_dir, returns the number attached"""
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return 0
+
+        attached = 0
+        for path in sorted(self.cache_dir.glob("hermite_*_*.npy")):
+            try:
+                _, n_basis, n_points = path.stem.split("_")
+                self.get(int(n_basis), int(n_points))
+                attached += 1
+            except ValueError:
+                continue
+        return attached
+
+    def clear(self):
+        """Drop all in-memory tables (persisted files are kept)"""
+        with self._lock:
+            self._tables.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None
+            }
+
+    def _evict(self):
+        # Always keep the most recently inserted table, even if it exceeds the budget
+        while self._bytes > self.max_bytes and len(self._tables) > 1:
+            _, table = self._tables.popitem(last=False)
+            self._bytes -= table.nbytes
+
+    def _path(self, key: Tuple[int, int]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"hermite_{key[0]}_{key[1]}.npy"
+
+    def _load(self, key: Tuple[int, int]) -> Optional[np.ndarray]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            table = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable basis table {path}: {e}")
+            return None
+        if table.shape != key:
+            return None
+        return table
+
+    def _persist(self, key: Tuple[int, int], table: np.ndarray):
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent workers never map a partial table
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, table)
+            tmp_path.replace(path)
+        except OSError as e:
+            self.logger.warning(f"Could not persist basis table {path}: {e}")
+
+
+# Process-wide provider shared by all analyzer instances
+default_basis_provider = HermiteBasisProvider(cache_dir=os.environ.get("QOFA_BASIS_CACHE_DIR"))
@@ -0,0 +1,274 @@
+"""
+Market Data Codecs for QOFA
+Binary and columnar request/response encodings for the analysis endpoints
+
+Supported media types:
+- application/json (default)
+- application/x-npy: NumPy .npy body, request only
+- application/msgpack: price/volume as raw little-endian float64 bytes or lists
+- application/vnd.apache.arrow.stream / .file: Arrow IPC with price/volume columns
+
+Binary payloads are decoded with np.frombuffer / Arrow zero-copy views, so the
+analyzer receives float64 arrays without intermediate Python lists.
+"""
+
+import io
+import json
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+JSON = "application/json"
+NPY = "application/x-npy"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/octet-stream+npy": NPY,
+}
+
+
+class UnsupportedMediaTypeError(Exception):
+    """Raised for media types that cannot be decoded or encoded"""
+
+
+class PayloadDecodeError(Exception):
+    """Raised for bodies that do not match their declared media type"""
+
+
+@dataclass
+class MarketSeries:
+    """One symbol's price/volume series decoded from a request body"""
+    symbol: str
+    price_data: np.ndarray
+    volume_data: np.ndarray
+    timestamp: datetime
+
+
+def media_type(header: Optional[str]) -> str:
+    """Normalize a Content-Type / Accept value to one of the supported media types"""
+    if not header:
+        return JSON
+    value = header.split(";")[0].strip().lower()
+    return _ALIASES.get(value, value)
+
+
+def _accept_entries(accept: str) -> List[str]:
+    """Accept header media ranges ordered by descending q-value, dropping q=0"""
+    entries = []
+    for position, candidate in enumerate(accept.split(",")):
+        value, *params = candidate.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, setting = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(setting)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and value.strip():
+            entries.append((-quality, position, media_type(value)))
+    return [value for _, _, value in sorted(entries)]
+
+
+def negotiate_response_type(accept: Optional[str]) -> str:
+    """Pick the most preferred supported response media type from an Accept header"""
+    if not accept:
+        return JSON
+    for value in _accept_entries(accept):
+        if value in (JSON, MSGPACK, ARROW_STREAM, ARROW_FILE):
+            return value
+        if value in ("*/*", "application/*"):
+            return JSON
+    raise UnsupportedMediaTypeError(f"None of the accepted media types are supported: {accept}")
+
+
+def _float_array(value: Any, name: str) -> np.ndarray:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) % 8:
+            raise PayloadDecodeError(f"{name} byte length is not a multiple of 8")
+        return np.frombuffer(value, dtype="<f8")
+    return np.asarray(value, dtype=float)
+
+
+def _check_lengths(series: MarketSeries) -> MarketSeries:
+    if series.price_data.shape != series.volume_data.shape or series.price_data.ndim != 1:
+        raise PayloadDecodeError(f"{series.symbol}: price_data and volume_data lengths differ")
+    return series
+
+
+def _decode_npy(body: bytes, symbol: Optional[str], timestamp: datetime) -> List[MarketSeries]:
+    """(2 × N) float array or structured array with price/volume fields"""
+    buffer = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(buffer)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buffer)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buffer)
+        if dtype.hasobject:
+            raise ValueError("object arrays are not accepted")
+        # View the payload in place instead of copying it out of the request body
+        array = np.frombuffer(body, dtype=dtype, offset=buffer.tell(), count=int(np.prod(shape)))
+        array = array.reshape(shape, order="F" if fortran_order else "C")
+    except ValueError as e:
+        raise PayloadDecodeError(f"Invalid .npy body: {e}")
+
+    if array.dtype.names:
+        if "price" not in array.dtype.names or "volume" not in array.dtype.names:
+            raise PayloadDecodeError("Structured .npy body needs 'price' and 'volume' fields")
+        price, volume = array["price"], array["volume"]
+    elif array.ndim == 2 and array.shape[0] == 2:
+        price, volume = array[0], array[1]
+    else:
+        raise PayloadDecodeError("Expected a (2, N) array or price/volume structured array")
+
+    return [_check_lengths(MarketSeries(symbol or "UNKNOWN", price.astype(float, copy=False),
+                                        volume.astype(float, copy=False), timestamp))]
+
+
+def _decode_msgpack(body: bytes, timestamp: datetime) -> Tuple[List[MarketSeries], Dict]:
+    if msgpack is None:
+        raise UnsupportedMediaTypeError("msgpack support requires the 'msgpack' package")
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise PayloadDecodeError(f"Invalid msgpack body: {e}")
+    if not isinstance(payload, dict):
+        raise PayloadDecodeError("msgpack body must be a map")
+
+    items = payload.get("items", [payload])
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise PayloadDecodeError("msgpack items must be a list of maps")
+    series = [
+        _check_lengths(MarketSeries(
+            symbol=str(item["symbol"]),
+            price_data=_float_array(item["price_data"], "price_data"),
+            volume_data=_float_array(item["volume_data"], "volume_data"),
+            timestamp=timestamp
+        ))
+        for item in items
+    ]
+    options = {key: value for key, value in payload.items() if key not in ("items", "symbol",
+                                                                           "price_data", "volume_data")}
+    return series, options
+
+
+def _decode_arrow(body: bytes, content_type: str, symbol: Optional[str],
+                  timestamp: datetime) -> List[MarketSeries]:
+    """Arrow table with price/volume columns and an optional symbol column (long format)"""
+    if pa is None:
+        raise UnsupportedMediaTypeError("Arrow support requires the 'pyarrow' package")
+    try:
+        reader = pa.ipc.open_stream(body) if content_type == ARROW_STREAM else pa.ipc.open_file(body)
+        table = reader.read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise PayloadDecodeError(f"Invalid Arrow IPC body: {e}")
+
+    if "price" not in table.column_names or "volume" not in table.column_names:
+        raise PayloadDecodeError("Arrow body needs 'price' and 'volume' columns")
+
+    def column(name: str) -> np.ndarray:
+        chunked = table.column(name).cast(pa.float64())
+        if chunked.num_chunks == 1 and chunked.null_count == 0:
+            return chunked.chunk(0).to_numpy(zero_copy_only=True)
+        return chunked.to_numpy()
+
+    price, volume = column("price"), column("volume")
+    metadata = table.schema.metadata or {}
+    default_symbol = symbol or metadata.get(b"symbol", b"UNKNOWN").decode()
+
+    if "symbol" not in table.column_names:
+        return [_check_lengths(MarketSeries(default_symbol, price, volume, timestamp))]
+
+    # Long format: one series per symbol, in order of first appearance. Dictionary
+    # codes follow first appearance, so a stable sort by code groups each symbol's rows
+    encoded = table.column("symbol").cast(pa.string()).combine_chunks().dictionary_encode()
+    if encoded.null_count:
+        raise PayloadDecodeError("Arrow symbol column contains nulls")
+    codes = encoded.indices.to_numpy(zero_copy_only=False)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=len(encoded.dictionary)))[:-1]
+    return [
+        _check_lengths(MarketSeries(str(name), price[rows], volume[rows], timestamp))
+        for name, rows in zip(encoded.dictionary.to_pylist(), np.split(order, bounds))
+    ]
+
+
+def decode_market_data(body: bytes, content_type: Optional[str], symbol: Optional[str] = None
+                       ) -> Tuple[List[MarketSeries], Dict]:
+    """
+    Decode a binary analysis request body into MarketSeries
+
+    Returns the series and any extra top-level options (e.g. stream) carried
+    by the payload. JSON bodies are handled by the Pydantic models instead.
+    """
+    kind = media_type(content_type)
+    timestamp = datetime.utcnow()
+    if kind == NPY:
+        return _decode_npy(body, symbol, timestamp), {}
+    if kind == MSGPACK:
+        return _decode_msgpack(body, timestamp)
+    if kind in (ARROW_STREAM, ARROW_FILE):
+        return _decode_arrow(body, kind, symbol, timestamp), {}
+    raise UnsupportedMediaTypeError(f"Unsupported Content-Type: {content_type}")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_payload(payload: Dict, kind: str) -> bytes:
+    """
+    Encode an analysis response for a negotiated media type
+
+    Arrow responses carry the trading signals as a table; every other
+    top-level field is stored as JSON in the schema metadata.
+    """
+    if kind == MSGPACK:
+        if msgpack is None:
+            raise UnsupportedMediaTypeError("msgpack support requires the 'msgpack' package")
+        return msgpack.packb(payload, default=_json_default, use_bin_type=True)
+
+    if kind in (ARROW_STREAM, ARROW_FILE):
+        if pa is None:
+            raise UnsupportedMediaTypeError("Arrow support requires the 'pyarrow' package")
+        signals = payload.get("signals", [])
+        table = pa.Table.from_pylist([
+            {key: value for key, value in signal.items() if key != "metadata"} | signal.get("metadata", {})
+            for signal in signals
+        ])
+        metadata = {key: json.dumps(value, default=_json_default)
+                    for key, value in payload.items() if key != "signals"}
+        table = table.replace_schema_metadata(metadata)
+        sink = pa.BufferOutputStream()
+        writer_cls = pa.ipc.new_stream if kind == ARROW_STREAM else pa.ipc.new_file
+        with writer_cls(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    if kind == JSON:
+        return json.dumps(payload, default=_json_default).encode()
+
+    raise UnsupportedMediaTypeError(f"Unsupported response media type: {kind}")
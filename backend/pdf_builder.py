@@ -0,0 +1,205 @@
+"""
+White Paper PDF Builder for QOFA
+Fingerprinted, incremental PDF builds for the QOFA white paper
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from whitepaper_cache import WhitePaperContentCache
+from whitepaper_generator import QOFAWhitePaper
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when the rendering pipeline changes in a way the inputs do not capture
+BUILDER_VERSION = "1"
+
+# Additional CSS for PDF optimization
+PDF_CSS = '''
+    @page {
+        size: A4;
+        margin: 2cm;
+    }
+    body {
+        font-size: 12px;
+    }
+    .header {
+        text-align: center;
+        margin-bottom: 30px;
+    }
+    .title {
+        font-size: 20px;
+        font-weight: bold;
+    }
+    .section {
+        margin-bottom: 20px;
+    }
+    .key-point {
+        background: #f0f8ff;
+        padding: 10px;
+        margin: 10px 0;
+        border-left: 3px solid #3498db;
+    }
+    .equation {
+        text-align: center;
+        font-family: monospace;
+        background: #f5f5f5;
+        padding: 10px;
+        margin: 15px 0;
+        border-left: 3px solid #3498db;
+    }
+'''
+
+
+@lru_cache(maxsize=1)
+def _weasyprint_resources():
+    """Font configuration and parsed stylesheet, shared by every build in this process"""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    return font_config, CSS(string=PDF_CSS, font_config=font_config)
+
+
+class WhitePaperPDFBuilder:
+    """
+    Builds the white paper PDF only when its inputs change
+
+    The fingerprint covers the builder version, engine, PDF stylesheet, the
+    engine's source input (HTML for WeasyPrint, the ReportLab script) and the
+    QOFAWhitePaper content. It is stored next to the artifact in a
+    <name>.build.json manifest; builds with a matching manifest are skipped.
+    Within a process, WeasyPrint's font configuration and parsed CSS are
+    reused across builds.
+    """
+
+    ENGINES = ("weasyprint", "reportlab")
+
+    def __init__(self, html_path: Optional[Path] = None, output_path: Optional[Path] = None,
+                 engine: str = "weasyprint", content_cache: Optional[WhitePaperContentCache] = None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown PDF engine: {engine}")
+
+        self.html_path = Path(html_path or REPO_ROOT / "qofa_white_paper_simple.html")
+        self.output_path = Path(output_path or REPO_ROOT / "QOFA_White_Paper_Simple.pdf")
+        self.manifest_path = self.output_path.with_name(self.output_path.name + ".build.json")
+        self.script_path = REPO_ROOT / "create_simple_pdf.py"
+        self.engine = engine
+        self.content_cache = content_cache or WhitePaperContentCache(QOFAWhitePaper())
+        self.logger = logging.getLogger(__name__)
+
+        self._source_digest: Dict[Path, tuple] = {}
+        self._build_task: Optional[asyncio.Future] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def source_path(self) -> Path:
+        return self.html_path if self.engine == "weasyprint" else self.script_path
+
+    def _file_digest(self, path: Path) -> str:
+        # Re-hash only when the file's size or mtime changes
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._source_digest.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, hashlib.sha256(path.read_bytes()).hexdigest())
+            self._source_digest[path] = cached
+        return cached[1]
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for part in (BUILDER_VERSION, self.engine, PDF_CSS,
+                     self._file_digest(self.source_path),
+                     self.content_cache.get("json").etag):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def manifest(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self) -> bool:
+        manifest = self.manifest()
+        return (self.output_path.exists() and manifest is not None
+                and manifest.get("fingerprint") == self.fingerprint())
+
+    def build(self, force: bool = False) -> bool:
+        """Render the PDF if its inputs changed; returns True when a new file was written"""
+        fingerprint = self.fingerprint()
+        manifest = self.manifest()
+        if not force and self.output_path.exists() and manifest and manifest.get("fingerprint") == fingerprint:
+            return False
+
+        # Render to a temporary file so readers never see a partial PDF
+        tmp_path = self.output_path.with_name(f".{self.output_path.name}.{os.getpid()}.tmp")
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._render(tmp_path)
+            tmp_path.replace(self.output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self.manifest_path.write_text(json.dumps({
+            "fingerprint": fingerprint,
+            "engine": self.engine,
+            "source": str(self.source_path),
+            "size": self.output_path.stat().st_size,
+            "built_at": datetime.utcnow().isoformat()
+        }, indent=2))
+        return True
+
+    def _render(self, pdf_path: Path):
+        if self.engine == "weasyprint":
+            from weasyprint import HTML
+
+            font_config, stylesheet = _weasyprint_resources()
+            HTML(filename=str(self.html_path)).write_pdf(
+                str(pdf_path),
+                stylesheets=[stylesheet],
+                font_config=font_config
+            )
+        else:
+            spec = importlib.util.spec_from_file_location("create_simple_pdf", self.script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.create_qofa_pdf(str(pdf_path))
+
+    @property
+    def building(self) -> bool:
+        return self._build_task is not None and not self._build_task.done()
+
+    def ensure_current(self) -> Optional[asyncio.Future]:
+        """
+        Schedule a background rebuild if the artifact is stale
+
+        Must be called from the event loop. At most one build runs at a time;
+        the running build's future is returned, or None when up to date.
+        """
+        if self.building:
+            return self._build_task
+        if self.is_current():
+            return None
+
+        loop = asyncio.get_running_loop()
+        self._build_task = loop.run_in_executor(None, self.build)
+        self._build_task.add_done_callback(self._build_finished)
+        return self._build_task
+
+    def _build_finished(self, future: asyncio.Future):
+        error = None if future.cancelled() else future.exception()
+        self.last_error = str(error) if error else None
+        if error:
+            self.logger.error(f"White paper PDF build failed: {error}")
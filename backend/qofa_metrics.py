@@ -0,0 +1,313 @@
+"""
+QOFA Metrics
+Prometheus-style counters, histograms and kernel timers for the QOFA backend
+
+Metrics are collected only when QOFA_METRICS=1. When disabled, kernel_timer
+returns a shared no-op context manager and the HTTP middleware is not
+installed, so instrumented code pays a single flag check. Samples recorded
+in analysis worker processes are drained after each job and merged into the
+server's registry by AnalysisExecutor.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+ENABLED = os.environ.get("QOFA_METRICS", "0").lower() in ("1", "true", "yes")
+
+# Seconds; spans sub-millisecond kernels to slow analysis requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}_total{_format_labels(labels)} {_format_value(value)}"
+
+    def drain(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelKey, float]):
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = {key: ([*state[0]], state[1], state[2]) for key, state in self._values.items()}
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                bucket_labels = labels + (("le", _format_value(float(bound))),)
+                yield f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+    def drain(self) -> Dict[LabelKey, list]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelKey, list]):
+        with self._lock:
+            for key, (counts, total, count) in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    self._values[key] = [list(counts), total, count]
+                    continue
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+
+
+class Gauge:
+    """Gauge whose labelled values are read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[LabelKey, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self.callback().items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Registry:
+    """Named metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str,
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def gauge(self, name: str, documentation: str,
+              callback: Callable[[], Dict[LabelKey, float]]) -> Gauge:
+        return self._register(Gauge(name, documentation, callback))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, dict]:
+        """Take and reset every counter/histogram value (used in worker processes)"""
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if hasattr(metric, "drain")]
+        return {metric.name: metric.drain() for metric in metrics}
+
+    def merge(self, drained: Dict[str, dict]):
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in drained.items():
+            metric = metrics.get(name)
+            if metric is not None and values:
+                metric.merge(values)
+
+
+REGISTRY = Registry()
+
+KERNEL_SECONDS = REGISTRY.histogram(
+    "qofa_kernel_duration_seconds",
+    "Wall time of QuantumOptionsFlowAnalyzer kernels by input size (rounded up to a power of two)"
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "qofa_http_request_duration_seconds",
+    "HTTP request latency by method, route template and status, including streamed bodies"
+)
+MONGO_SECONDS = REGISTRY.histogram(
+    "qofa_mongo_operation_duration_seconds",
+    "MongoDB command latency by command name and outcome"
+)
+EXECUTOR_JOBS = REGISTRY.counter(
+    "qofa_executor_job_outcomes",
+    "Analysis executor jobs by outcome: completed, failed, cancelled, timed_out or rejected"
+)
+RESULT_CACHE_LOOKUPS = REGISTRY.counter(
+    "qofa_result_cache_lookups",
+    "Result cache lookups by outcome"
+)
+
+
+def size_bucket(size: int) -> str:
+    """Power-of-two size label, bounding label cardinality"""
+    size = int(size)
+    return str(1 << (size - 1).bit_length()) if size > 1 else str(max(size, 0))
+
+
+class _KernelTimer:
+    __slots__ = ("kernel", "size", "start")
+
+    def __init__(self, kernel: str, size: int):
+        self.kernel = kernel
+        self.size = size
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        KERNEL_SECONDS.observe(time.perf_counter() - self.start,
+                               kernel=self.kernel, size=size_bucket(self.size))
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def kernel_timer(kernel: str, size: int):
+    """Context manager timing one kernel call; a no-op when metrics are disabled"""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _KernelTimer(kernel, size)
+
+
+def call_and_drain(fn: Callable, *args) -> Tuple[object, Optional[Dict[str, dict]]]:
+    """Run fn in a worker process and hand its metric samples back to the parent"""
+    result = fn(*args)
+    return result, REGISTRY.drain() if ENABLED else None
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware observing HTTP_SECONDS for every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route on the scope; templates keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"],
+                                 route=route, status=str(status[0]))
+
+
+def mongo_command_listener():
+    """pymongo CommandListener observing MONGO_SECONDS"""
+    from pymongo import monitoring
+
+    class MongoCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+        def failed(self, event):
+            MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+    return MongoCommandListener()
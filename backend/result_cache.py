@@ -0,0 +1,188 @@
+"""
+Analysis Result Cache for QOFA
+Content-addressed cache for quantum flow results, keyed on the input buffers
+
+Keys hash the raw float64 price/volume bytes together with the analyzer
+parameters that affect the result, so identical payloads (e.g. the demo page
+re-posting sample data) are served without recomputing Ψ. Results live in a
+bounded in-process LRU tier and, optionally, a Mongo collection with a TTL
+index shared by every server process.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import market_data_codecs as codecs
+import qofa_metrics
+
+
+# Bump when analysis output changes for the same inputs
+RESULT_CACHE_VERSION = "1"
+
+
+def result_key(symbol: str, price_data: np.ndarray, volume_data: np.ndarray,
+               params: Dict[str, Any]) -> str:
+    """Content hash of one analysis request"""
+    digest = hashlib.blake2b(digest_size=20)
+    header = json.dumps({"v": RESULT_CACHE_VERSION, "symbol": symbol, "params": params,
+                         "n": len(price_data)}, sort_keys=True)
+    digest.update(header.encode("utf-8"))
+    for values in (price_data, volume_data):
+        digest.update(np.ascontiguousarray(values, dtype="<f8").data)
+    return digest.hexdigest()
+
+
+class MemoryResultTier:
+    """LRU of JSON-encoded results bounded by total encoded size"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = body
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self._bytes,
+                "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class MongoResultTier:
+    """Results stored as documents in a collection that expires them by TTL index"""
+
+    TTL_INDEX = "created_at_1"
+
+    def __init__(self, collection, ttl_seconds: int):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+
+    async def ensure_indexes(self):
+        """Create the TTL index, or retune an existing one to ttl_seconds"""
+        existing = (await self.collection.index_information()).get(self.TTL_INDEX)
+        if existing is not None and "expireAfterSeconds" not in existing:
+            # A plain index on created_at cannot take a TTL in place
+            await self.collection.drop_index(self.TTL_INDEX)
+            existing = None
+        if existing is None:
+            await self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        elif existing["expireAfterSeconds"] != self.ttl_seconds:
+            # create_index would fail with IndexOptionsConflict; collMod changes the TTL in place
+            await self.collection.database.command({
+                "collMod": self.collection.name,
+                "index": {"keyPattern": {"created_at": 1}, "expireAfterSeconds": self.ttl_seconds}
+            })
+
+    async def get(self, key: str) -> Optional[bytes]:
+        document = await self.collection.find_one({"_id": key}, {"body": 1})
+        return bytes(document["body"]) if document else None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Bodies for whichever keys are stored, in one $in query"""
+        cursor = self.collection.find({"_id": {"$in": keys}}, {"body": 1})
+        return {document["_id"]: bytes(document["body"]) async for document in cursor}
+
+    async def put(self, key: str, body: bytes):
+        await self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "body": body, "size": len(body), "created_at": datetime.utcnow()},
+            upsert=True
+        )
+
+
+class ResultCache:
+    """
+    Two-tier analysis result cache
+
+    Lookups try the in-process tier, then the Mongo tier (promoting hits into
+    memory). Mongo failures are logged and treated as misses so the cache
+    never fails a request.
+    """
+
+    def __init__(self, memory: Optional[MemoryResultTier] = None,
+                 mongo: Optional[MongoResultTier] = None):
+        self.memory = memory or MemoryResultTier()
+        self.mongo = mongo
+        self.logger = logging.getLogger(__name__)
+
+        self.hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+    async def ensure_indexes(self):
+        if self.mongo is not None:
+            await self.mongo.ensure_indexes()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict]]:
+        """Results for keys in order (None for misses); memory misses share one Mongo query"""
+        bodies = [self.memory.get(key) for key in keys]
+        missing = list({key for key, body in zip(keys, bodies) if body is None})
+        if missing and self.mongo is not None:
+            found = {}
+            try:
+                found = await self.mongo.get_many(missing)
+            except Exception as e:
+                self.logger.warning(f"Result cache lookup failed: {e}")
+            for key, body in found.items():
+                self.mongo_hits += 1
+                self.memory.put(key, body)
+            bodies = [found.get(key) if body is None else body for key, body in zip(keys, bodies)]
+
+        results = [None if body is None else json.loads(body) for body in bodies]
+        misses = results.count(None)
+        self.hits += len(results) - misses
+        self.misses += misses
+        if qofa_metrics.ENABLED:
+            qofa_metrics.RESULT_CACHE_LOOKUPS.inc(len(results) - misses, outcome="hit")
+            qofa_metrics.RESULT_CACHE_LOOKUPS.inc(misses, outcome="miss")
+        return results
+
+    async def put(self, key: str, result: Dict):
+        body = codecs.encode_payload(result, codecs.JSON)
+        self.memory.put(key, body)
+        if self.mongo is not None:
+            try:
+                await self.mongo.put(key, body)
+            except Exception as e:
+                self.logger.warning(f"Result cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "mongo_hits": self.mongo_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory": self.memory.stats(),
+            "mongo_ttl_seconds": self.mongo.ttl_seconds if self.mongo is not None else None
+        }
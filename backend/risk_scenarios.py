@@ -0,0 +1,249 @@
+"""
+Monte Carlo Risk Scenarios for QOFA
+Correlated return scenarios, VaR/CVaR and loss distributions for a portfolio
+
+Returns over the horizon are modelled as r = σ √(h/252) ∘ (L z) with L the
+Cholesky factor of the correlation matrix and z standard normal. Paths are
+drawn in fixed-size chunks, each with its own SeedSequence child of the run
+seed, so results depend only on (seed, n_paths, chunk_size) and not on how
+chunks are scheduled across workers.
+
+The portfolio P&L of a path is w·r = z·b with b = Lᵀ(σ √(h/252) ∘ w), so the
+loss pass costs O(n) per path after drawing z. Component CVaR is linear in
+the tail draws too: a second pass over the same seeds sums z over the tail
+paths and the parent maps that sum through L once.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from qofa_core import RiskInputs
+
+
+TRADING_DAYS = 252
+
+# Chunk layout is part of the result's identity: change it and the sampled paths change
+DEFAULT_CHUNK_SIZE = 65536
+DEFAULT_MAX_CHUNK_BYTES = 64 * 1024**2
+
+
+def correlation_factor(correlation: np.ndarray) -> np.ndarray:
+    """
+    Lower-triangular factor L with L Lᵀ ≈ correlation
+
+    Matrices that are not positive definite (e.g. inconsistent pairwise
+    inputs) are first projected onto the nearest correlation matrix by
+    clipping negative eigenvalues and restoring the unit diagonal.
+    """
+    correlation = np.asarray(correlation, dtype=float)
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh((correlation + correlation.T) / 2)
+        repaired = (eigenvectors * np.maximum(eigenvalues, 1e-10)) @ eigenvectors.T
+        scale = 1 / np.sqrt(np.diag(repaired))
+        repaired *= np.outer(scale, scale)
+        return np.linalg.cholesky(repaired + 1e-12 * np.eye(len(repaired)))
+
+
+@dataclass
+class ScenarioPlan:
+    """Everything needed to simulate and merge one scenario run"""
+    factor: np.ndarray            # L, (n × n)
+    exposure: np.ndarray          # σ √(h/252) ∘ w
+    loadings: np.ndarray          # b = Lᵀ exposure
+    chunks: List[Tuple[int, np.random.SeedSequence]]
+    confidence_levels: Tuple[float, ...]
+    tail_size: int
+    bin_edges: np.ndarray
+    n_paths: int
+    horizon_days: float
+    seed: int
+    chunk_size: int
+
+    @property
+    def parametric_std(self) -> float:
+        return float(np.linalg.norm(self.loadings))
+
+    def tail_counts(self) -> Dict[float, int]:
+        return {level: max(1, math.ceil((1 - level) * self.n_paths)) for level in self.confidence_levels}
+
+
+def plan_scenarios(weights: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                   n_paths: int = 100_000, horizon_days: float = 1.0,
+                   confidence_levels: Sequence[float] = (0.95, 0.99), seed: int = 0,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+                   bins: int = 50) -> ScenarioPlan:
+    weights = np.asarray(weights, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    if weights.shape != volatilities.shape or weights.ndim != 1:
+        raise ValueError("weights and volatilities must be vectors of the same length")
+    if n_paths < 1:
+        raise ValueError("n_paths must be positive")
+    if not all(0 < level < 1 for level in confidence_levels):
+        raise ValueError("confidence levels must lie in (0, 1)")
+
+    n_assets = len(weights)
+    factor = correlation_factor(correlation) if n_assets else np.zeros((0, 0))
+    exposure = volatilities * math.sqrt(horizon_days / TRADING_DAYS) * weights
+    loadings = factor.T @ exposure
+
+    # Bound the (paths × assets) normal draws of a chunk
+    chunk_size = max(1, min(chunk_size, max_chunk_bytes // (8 * max(n_assets, 1))))
+    n_chunks = math.ceil(n_paths / chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    chunks = [(min(chunk_size, n_paths - i * chunk_size), seeds[i]) for i in range(n_chunks)]
+
+    levels = tuple(sorted(confidence_levels))
+    sigma = float(np.linalg.norm(loadings)) or 1.0
+    return ScenarioPlan(
+        factor=factor, exposure=exposure, loadings=loadings, chunks=chunks,
+        confidence_levels=levels,
+        tail_size=max(1, math.ceil((1 - levels[0]) * n_paths)),
+        bin_edges=np.linspace(-6 * sigma, 6 * sigma, bins + 1),
+        n_paths=n_paths, horizon_days=horizon_days, seed=seed, chunk_size=chunk_size
+    )
+
+
+def _draw(n_paths: int, n_assets: int, seed: np.random.SeedSequence) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n_paths, n_assets))
+
+
+def simulate_losses(loadings: np.ndarray, n_paths: int, seed: np.random.SeedSequence,
+                    tail_size: int, bin_edges: np.ndarray) -> Dict:
+    """One chunk: largest tail_size losses, P&L histogram and moments"""
+    pnl = _draw(n_paths, len(loadings), seed) @ loadings
+    losses = -pnl
+
+    k = min(tail_size, n_paths)
+    tail = np.partition(losses, n_paths - k)[n_paths - k:] if k < n_paths else losses.copy()
+    counts, _ = np.histogram(pnl, bins=bin_edges)
+    return {
+        "tail": np.sort(tail)[::-1],
+        "counts": counts,
+        "below": int(np.count_nonzero(pnl < bin_edges[0])),
+        "above": int(np.count_nonzero(pnl > bin_edges[-1])),
+        "sum": float(pnl.sum()),
+        "sum_sq": float(np.dot(pnl, pnl)),
+        "n": n_paths
+    }
+
+
+def tail_draw_sums(loadings: np.ndarray, n_paths: int, seed: np.random.SeedSequence,
+                   thresholds: Sequence[float]) -> List[Tuple[np.ndarray, int]]:
+    """One chunk: Σ z and path count over paths whose loss reaches each threshold"""
+    z = _draw(n_paths, len(loadings), seed)
+    losses = -(z @ loadings)
+    sums = []
+    for threshold in thresholds:
+        mask = losses >= threshold
+        sums.append((z[mask].sum(axis=0), int(np.count_nonzero(mask))))
+    return sums
+
+
+def merge_losses(plan: ScenarioPlan, chunk_results: Iterable[Dict]) -> Dict:
+    """Combine chunk results into VaR/CVaR, moments and the loss distribution"""
+    chunk_results = list(chunk_results)
+    tail = np.sort(np.concatenate([result["tail"] for result in chunk_results]))[::-1]
+    total = sum(result["sum"] for result in chunk_results)
+    total_sq = sum(result["sum_sq"] for result in chunk_results)
+    n = sum(result["n"] for result in chunk_results)
+
+    mean = total / n
+    var, cvar = {}, {}
+    for level, k in plan.tail_counts().items():
+        var[level] = float(tail[k - 1])
+        cvar[level] = float(tail[:k].mean())
+
+    return {
+        "n_paths": n,
+        "horizon_days": plan.horizon_days,
+        "seed": plan.seed,
+        "chunks": len(plan.chunks),
+        "chunk_size": plan.chunk_size,
+        "mean_pnl": mean,
+        "std_pnl": math.sqrt(max(total_sq / n - mean**2, 0.0)),
+        "parametric_std": plan.parametric_std,
+        "var": var,
+        "cvar": cvar,
+        "distribution": {
+            "bin_edges": plan.bin_edges.tolist(),
+            "counts": np.sum([result["counts"] for result in chunk_results], axis=0).tolist(),
+            "below": sum(result["below"] for result in chunk_results),
+            "above": sum(result["above"] for result in chunk_results)
+        }
+    }
+
+
+def merge_components(plan: ScenarioPlan, chunk_sums: Iterable[List[Tuple[np.ndarray, int]]]
+                     ) -> Dict[float, np.ndarray]:
+    """Per-asset CVaR contributions, -E[w_i r_i | loss ≥ VaR]; they sum to the CVaR"""
+    chunk_sums = list(chunk_sums)
+    components = {}
+    for i, level in enumerate(plan.confidence_levels):
+        z_sum = np.sum([sums[i][0] for sums in chunk_sums], axis=0)
+        count = sum(sums[i][1] for sums in chunk_sums)
+        components[level] = -plan.exposure * (plan.factor @ z_sum) / max(count, 1)
+    return components
+
+
+def run_scenarios(weights: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                  components: bool = True, map_fn: Callable = map, **plan_options) -> Dict:
+    """
+    Simulate a scenario run synchronously
+
+    map_fn distributes chunks, e.g. ProcessPoolExecutor(...).map for a
+    process pool; the default runs them in this process.
+    """
+    plan = plan_scenarios(weights, volatilities, correlation, **plan_options)
+    n_chunks = len(plan.chunks)
+    metrics = merge_losses(plan, map_fn(
+        simulate_losses, [plan.loadings] * n_chunks, *zip(*plan.chunks),
+        [plan.tail_size] * n_chunks, [plan.bin_edges] * n_chunks
+    ))
+    if components:
+        thresholds = [metrics["var"][level] for level in plan.confidence_levels]
+        metrics["component_cvar"] = merge_components(plan, map_fn(
+            tail_draw_sums, [plan.loadings] * n_chunks, *zip(*plan.chunks), [thresholds] * n_chunks
+        ))
+    return metrics
+
+
+def symmetric_correlation(correlation: Union[np.ndarray, sp.spmatrix, None], n_assets: int) -> np.ndarray:
+    """
+    Dense symmetric correlation matrix with a unit diagonal
+
+    Entry [i, j] above the diagonal wins over [j, i]; a pair given in only
+    one order is mirrored. Missing pairs are uncorrelated. Repeated (i, j)
+    entries of a sparse input are summed, as scipy.sparse does when the
+    same matrix feeds the risk Hamiltonian.
+    """
+    result = np.zeros((n_assets, n_assets))
+    if correlation is not None:
+        entries = sp.coo_matrix(correlation)
+        entries.sum_duplicates()
+        lower = entries.row > entries.col
+        upper = entries.row < entries.col
+        result[entries.col[lower], entries.row[lower]] = entries.data[lower]
+        result[entries.row[upper], entries.col[upper]] = entries.data[upper]
+    result += result.T
+    np.fill_diagonal(result, 1.0)
+    return result
+
+
+def risk_arrays(portfolio: Dict[str, float], market_conditions: Dict[str, float]
+                ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Weights, volatilities and a symmetric correlation matrix from the
+    market_conditions dict used by quantum_risk_assessment
+
+    Missing volatilities default to 0.2 as in the risk Hamiltonian; a pair's
+    correlation is read from either key order.
+    """
+    inputs = RiskInputs.from_market_conditions(portfolio, market_conditions)
+    return (inputs.symbols, inputs.weights, inputs.volatilities,
+            symmetric_correlation(inputs.correlation, len(inputs.symbols)))
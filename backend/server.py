@@ -1,22 +1,39 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Optional, Tuple
 import uuid
 from datetime import datetime
 import json
+import re
+import asyncio
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 
 # Import QOFA modules
-from qofa_core import QuantumOptionsFlowAnalyzer, OptionsFlowSignal
+from qofa_core import QuantumOptionsFlowAnalyzer, OptionsFlowSignal, RiskInputs
+from hermite_basis import default_basis_provider
+from analysis_executor import AnalysisExecutor, ExecutorSaturatedError, AnalysisTimeoutError
+import analysis_jobs
+import risk_scenarios
+import market_data_codecs as codecs
 from whitepaper_generator import QOFAWhitePaper
+from whitepaper_cache import WhitePaperContentCache, RenderedBody
+from pdf_builder import WhitePaperPDFBuilder
+from status_store import StatusStore, StatusWriteBuffer, create_mongo_client
+from result_cache import ResultCache, MemoryResultTier, MongoResultTier, result_key
+from signal_hub import SignalHub
+from streaming_flow import StreamingFlowAnalyzer
+from covariance_store import CovarianceStore
+import qofa_metrics
 
 
 ROOT_DIR = Path(__file__).parent
@@ -24,8 +41,13 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = create_mongo_client(mongo_url)
 db = client[os.environ['DB_NAME']]
+status_store = StatusStore(db.status_checks, StatusWriteBuffer(
+    db.status_checks,
+    max_batch=int(os.environ.get('STATUS_WRITE_BATCH', 500)),
+    flush_interval=float(os.environ.get('STATUS_FLUSH_INTERVAL', 0.05))
+))
 
 # Create the main app without a prefix
 app = FastAPI(title="QOFA - Quantum Options Flow Analysis", version="1.0.0")
@@ -36,6 +58,65 @@ api_router = APIRouter(prefix="/api")
 # Initialize QOFA analyzer
 qofa_analyzer = QuantumOptionsFlowAnalyzer()
 whitepaper_generator = QOFAWhitePaper()
+whitepaper_cache = WhitePaperContentCache(whitepaper_generator)
+# The served PDF is built into a cache directory; the tracked artifact is only
+# rewritten by generate_pdf.py
+PDF_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'qofa'
+pdf_builder = WhitePaperPDFBuilder(
+    output_path=os.environ.get('QOFA_PDF_PATH') or PDF_CACHE_DIR / 'QOFA_White_Paper_Simple.pdf',
+    engine=os.environ.get('QOFA_PDF_ENGINE', 'reportlab'),
+    content_cache=whitepaper_cache
+)
+
+# CPU-bound analysis runs on a bounded pool so it never blocks the event loop
+BATCH_CHUNK_SIZE = int(os.environ.get("QOFA_BATCH_CHUNK_SIZE", 32))
+analysis_executor = AnalysisExecutor.from_env(initializer=analysis_jobs.warm_up)
+# A single request keeps at most this many chunks in flight, leaving the wait queue to other requests
+MAX_CHUNKS_IN_FLIGHT = int(os.environ.get("QOFA_MAX_CHUNKS_IN_FLIGHT", 0)) or analysis_executor.max_workers
+
+# Repeat analysis payloads are answered from a content-addressed result cache;
+# QOFA_RESULT_CACHE_TTL > 0 adds a shared Mongo tier expiring after that many seconds
+RESULT_CACHE_TTL = int(os.environ.get("QOFA_RESULT_CACHE_TTL", 0))
+result_cache = ResultCache(
+    MemoryResultTier(max_bytes=int(os.environ.get("QOFA_RESULT_CACHE_BYTES", 64 * 1024 * 1024))),
+    MongoResultTier(db.analysis_results, RESULT_CACHE_TTL) if RESULT_CACHE_TTL > 0 else None
+)
+
+# Live tick streams: each tick is analyzed once and fanned out to every subscriber
+STREAM_MAX_TICKS = int(os.environ.get("QOFA_STREAM_MAX_TICKS", 1000))
+SSE_KEEPALIVE_SECONDS = float(os.environ.get("QOFA_SSE_KEEPALIVE", 15))
+signal_hub = SignalHub(
+    StreamingFlowAnalyzer(max_symbols=int(os.environ.get("QOFA_STREAM_MAX_SYMBOLS", 10000))),
+    max_queue=int(os.environ.get("QOFA_STREAM_MAX_QUEUE", 256))
+)
+
+# Monte Carlo risk scenarios are opt-in (?paths=N); chunks are spread over the analysis executor
+RISK_SCENARIO_PATHS = int(os.environ.get("QOFA_RISK_SCENARIO_PATHS", 0))
+RISK_MAX_PATHS = int(os.environ.get("QOFA_RISK_MAX_PATHS", 5_000_000))
+
+# EWMA volatility/covariance per symbol universe, fed by market bars and read by risk assessment
+covariance_store = CovarianceStore(
+    decay=float(os.environ.get("QOFA_COVARIANCE_DECAY", 0.94)),
+    bars_per_year=float(os.environ.get("QOFA_COVARIANCE_BARS_PER_YEAR", 252)),
+    snapshot_dir=os.environ.get("QOFA_COVARIANCE_DIR") or None,
+    collection=db.covariance_snapshots,
+    snapshot_interval=float(os.environ.get("QOFA_COVARIANCE_SNAPSHOT_INTERVAL", 60))
+)
+
+
+async def run_analysis(fn, *args):
+    """Run an analysis job on the executor, mapping back-pressure to HTTP errors"""
+    try:
+        return await analysis_executor.run(fn, *args)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(int(e.retry_after))})
+    except AnalysisTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+def chunk_limiter() -> asyncio.Semaphore:
+    """Per-request bound on concurrent executor jobs, kept below the executor capacity"""
+    return asyncio.Semaphore(max(1, min(MAX_CHUNKS_IN_FLIGHT, analysis_executor.capacity - 1)))
 
 
 # Define Models
@@ -53,6 +134,17 @@ class MarketDataInput(BaseModel):
     volume_data: List[float]
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class BatchMarketDataInput(BaseModel):
+    items: List[MarketDataInput]
+    stream: bool = False  # Stream NDJSON lines as each chunk of symbols finishes
+
+class StreamMessage(BaseModel):
+    action: str  # 'subscribe', 'unsubscribe' or 'ticks'
+    symbols: List[str] = []
+    symbol: Optional[str] = None
+    prices: List[float] = []
+    volumes: List[float] = []
+
 class OptionsChainInput(BaseModel):
     symbol: str
     options_data: List[Dict]  # strike, volume, implied_volatility, etc.
@@ -61,6 +153,17 @@ class QuantumAnalysisRequest(BaseModel):
     symbols: List[str]
     analysis_type: str = "flow_detection"  # flow_detection, entanglement, risk_assessment
 
+class RiskArraysInput(BaseModel):
+    weights: List[float]
+    volatilities: List[float]
+    symbols: Optional[List[str]] = None
+    correlation: Optional[List[List[float]]] = None  # Dense (n × n)
+    correlation_entries: Optional[List[Tuple[int, int, float]]] = None  # Sparse (i, j, value) triplets
+
+class MarketBar(BaseModel):
+    prices: Dict[str, float]  # Closing price per symbol
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
 class TradingSignalResponse(BaseModel):
     signals: List[Dict]
     confidence: float
@@ -76,93 +179,486 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    # Buffered and written with insert_many in the background
+    status_store.add(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(limit: int = Query(1000, ge=1, le=1000), cursor: Optional[str] = None):
+    """Newest-first status checks; the X-Next-Cursor header points at the next page"""
+    try:
+        status_checks, next_cursor = await status_store.page(limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return JSONResponse(content=jsonable_encoder(status_checks), headers=headers)
+
+def cached_response(request: Request, rendered: RenderedBody) -> Response:
+    """Serve a pre-rendered body with ETag revalidation and content negotiation"""
+    body, encoding, etag = rendered.encoded(request.headers.get("accept-encoding"))
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if rendered.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=rendered.media_type, headers=headers)
 
 # QOFA-specific endpoints
 @api_router.get("/whitepaper")
-async def get_whitepaper():
+async def get_whitepaper(request: Request):
     """Get the complete QOFA white paper content"""
     try:
-        whitepaper_content = whitepaper_generator.generate_complete_whitepaper()
-        return JSONResponse(content=whitepaper_content)
+        return cached_response(request, whitepaper_cache.get("json"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/whitepaper/markdown")
-async def get_whitepaper_markdown():
+async def get_whitepaper_markdown(request: Request):
     """Get the white paper in markdown format"""
     try:
-        markdown_content = whitepaper_generator.export_to_markdown()
-        return {"content": markdown_content, "format": "markdown"}
+        return cached_response(request, whitepaper_cache.get("markdown"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/analyze/quantum-flow")
-async def analyze_quantum_flow(data: MarketDataInput):
-    """Analyze quantum options flow for a given symbol"""
+@api_router.get("/whitepaper/markdown/stream")
+async def stream_whitepaper_markdown():
+    """Stream the white paper markdown section by section"""
+    async def chunks():
+        for chunk in whitepaper_cache.markdown_chunks():
+            yield chunk
+    
+    return StreamingResponse(chunks(), media_type="text/markdown; charset=utf-8")
+
+@api_router.get("/whitepaper/sections")
+async def get_whitepaper_sections(request: Request):
+    """Table of contents with per-section byte sizes"""
     try:
-        # Convert input to DataFrame
-        market_df = pd.DataFrame({
-            'symbol': [data.symbol] * len(data.price_data),
-            'price': data.price_data,
-            'volume': data.volume_data,
-            'strike': data.price_data,  # Simplified for demo
-            'timestamp': [data.timestamp] * len(data.price_data)
-        })
-        
-        # Analyze using QOFA
-        flow_signals = qofa_analyzer.institutional_flow_detection(market_df)
-        trading_signals = qofa_analyzer.generate_trading_signals(market_df)
+        return cached_response(request, whitepaper_cache.get("toc"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/whitepaper/sections/{name}")
+async def get_whitepaper_section(name: str, request: Request, format: str = "json"):
+    """Get a single white paper section as JSON or markdown"""
+    if format not in ("json", "markdown"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    try:
+        rendered = whitepaper_cache.get(f"section:{name}" if format == "json" else f"section_markdown:{name}")
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown white paper section: {name}")
+    return cached_response(request, rendered)
+
+def iter_file_range(path: Path, start: int, length: int, chunk_size: int = 64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def ranged_file_response(request: Request, path: Path, media_type: str, etag: str) -> Response:
+    """Serve a file with ETag revalidation and single-range (bytes=) support"""
+    size = path.stat().st_size
+    headers = {"Accept-Ranges": "bytes", "ETag": etag, "Cache-Control": "no-cache",
+               "Content-Disposition": f'inline; filename="{path.name}"'}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or
+                          etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip()) if range_header else None
+    if match is None or (if_range and if_range != etag) or match.groups() == ("", ""):
+        # No range, a stale If-Range, or a multi-range request: send the whole file
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        # A syntactically invalid range is ignored rather than rejected
+        return FileResponse(path, media_type=media_type, headers=headers)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(0, size - int(last))
+        end = size - 1
+    if start >= size:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+    
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_file_range(path, start, end - start + 1), status_code=206,
+                             media_type=media_type, headers=headers)
+
+@api_router.get("/whitepaper/pdf")
+async def get_whitepaper_pdf(request: Request):
+    """Get the white paper PDF; stale artifacts are rebuilt in the background"""
+    try:
+        pdf_builder.ensure_current()
+    except Exception as e:
+        logger.error(f"Could not check white paper PDF inputs: {e}")
+    
+    path = pdf_builder.output_path
+    if not path.exists():
+        if pdf_builder.building:
+            raise HTTPException(status_code=503, detail="White paper PDF is being built",
+                                headers={"Retry-After": "5"})
+        raise HTTPException(status_code=500, detail=pdf_builder.last_error or "White paper PDF is unavailable")
+    
+    manifest = pdf_builder.manifest()
+    if manifest:
+        etag = '"' + manifest["fingerprint"][:32] + '"'
+    else:
+        stat = path.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return ranged_file_response(request, path, "application/pdf", etag)
+
+def market_series_openapi(model: type) -> Dict:
+    """
+    requestBody for endpoints that decode the raw body with read_market_series
+    
+    The JSON schema is inlined from the Pydantic model; binary media types are
+    documented as opaque bytes.
+    """
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(definitions[node["$ref"].rsplit("/", 1)[-1]])
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        return node
+    
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    content = {codecs.JSON: {"schema": inline(schema)}}
+    content.update({kind: binary for kind in (codecs.NPY, codecs.MSGPACK, codecs.ARROW_STREAM, codecs.ARROW_FILE)})
+    return {"requestBody": {"required": True, "content": content}}
+
+async def read_market_series(request: Request, model: type, symbol: Optional[str] = None):
+    """
+    Decode an analysis request body as JSON (via model) or a binary media type
+    
+    Returns the decoded series and the request options (e.g. stream).
+    """
+    body = await request.body()
+    content_type = codecs.media_type(request.headers.get("content-type"))
+    if content_type == codecs.JSON:
+        try:
+            data = model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        items = data.items if isinstance(data, BatchMarketDataInput) else [data]
+        series = [codecs.MarketSeries(item.symbol, np.asarray(item.price_data, dtype=float),
+                                      np.asarray(item.volume_data, dtype=float), item.timestamp)
+                  for item in items]
+        for item in series:
+            if item.price_data.shape != item.volume_data.shape:
+                raise HTTPException(status_code=400,
+                                    detail=f"{item.symbol}: price_data and volume_data lengths differ")
+        return series, data.model_dump(exclude={"items", "symbol", "price_data", "volume_data", "timestamp"})
+    
+    try:
+        return codecs.decode_market_data(body, content_type, symbol)
+    except codecs.UnsupportedMediaTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except (codecs.PayloadDecodeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request body: {e}")
+
+def flow_cache_key(item: codecs.MarketSeries) -> str:
+    params = {
+        "n_basis_states": qofa_analyzer.n_basis_states,
+        "planck_constant": qofa_analyzer.planck_constant,
+        "decoherence_time": qofa_analyzer.decoherence_time
+    }
+    return result_key(item.symbol, item.price_data, item.volume_data, params)
+
+def restamp_flow_result(result: Dict, timestamp: datetime) -> Dict:
+    # Signals carry the request timestamp, which is not part of the cache key
+    stamp = timestamp.isoformat()
+    for signal in result['signals']:
+        signal['timestamp'] = stamp
+    return result
+
+async def cached_flow_results(series: List[codecs.MarketSeries]):
+    """Split series into cached results by symbol and the (key, series) pairs still to analyze"""
+    keys = [flow_cache_key(item) for item in series]
+    cached, missing = {}, []
+    for key, item, result in zip(keys, series, await result_cache.get_many(keys)):
+        if result is None:
+            missing.append((key, item))
+        else:
+            cached[item.symbol] = restamp_flow_result(result, item.timestamp)
+    return cached, missing
+
+def response_media_type(request: Request) -> str:
+    try:
+        return codecs.negotiate_response_type(request.headers.get("accept"))
+    except codecs.UnsupportedMediaTypeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+def encoded_response(payload: Dict, media_type: str) -> Response:
+    try:
+        return Response(content=codecs.encode_payload(payload, media_type), media_type=media_type)
+    except codecs.UnsupportedMediaTypeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+@api_router.post("/analyze/quantum-flow", openapi_extra=market_series_openapi(MarketDataInput))
+async def analyze_quantum_flow(request: Request, symbol: Optional[str] = None):
+    """
+    Analyze quantum options flow for a given symbol
+    
+    Accepts a MarketDataInput JSON body or an .npy / msgpack / Arrow IPC body
+    (selected by Content-Type) and responds in the format negotiated via Accept.
+    """
+    media_type = response_media_type(request)
+    series, _ = await read_market_series(request, MarketDataInput, symbol)
+    if len(series) != 1:
+        raise HTTPException(status_code=400, detail="Expected exactly one symbol; use /analyze/quantum-flow/batch")
+    data = series[0]
+    
+    try:
+        key = flow_cache_key(data)
+        result = await result_cache.get(key)
+        if result is None:
+            # Ψ and detected flows are computed once and shared, off the event loop
+            result = await run_analysis(
+                analysis_jobs.analyze_quantum_flow,
+                data.symbol, data.price_data, data.volume_data, data.timestamp
+            )
+            await result_cache.put(key, result)
+        else:
+            result = restamp_flow_result(result, data.timestamp)
         
-        # Calculate quantum metrics
-        quantum_state = qofa_analyzer.quantum_field_operator(
-            np.array(data.price_data), 
-            np.array(data.volume_data)
+        response = TradingSignalResponse(
+            signals=result['signals'],
+            confidence=result['confidence'],
+            quantum_metrics=result['quantum_metrics'],
+            timestamp=datetime.utcnow()
         )
+        if media_type == codecs.JSON:
+            return response
+        return encoded_response(response.model_dump(), media_type)
         
-        quantum_correlation = np.mean(np.abs(quantum_state))
-        # Handle NaN or None values
-        if quantum_correlation is None or np.isnan(quantum_correlation):
-            quantum_correlation = 0.0
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/analyze/quantum-flow/batch", openapi_extra=market_series_openapi(BatchMarketDataInput))
+async def analyze_quantum_flow_batch(request: Request, stream: bool = False):
+    """
+    Analyze quantum options flow for many symbols, optionally streamed as NDJSON
+    
+    Accepts a BatchMarketDataInput JSON body, a msgpack map with items, or a
+    long-format Arrow IPC table with symbol/price/volume columns.
+    """
+    media_type = response_media_type(request)
+    series, options = await read_market_series(request, BatchMarketDataInput)
+    symbols = [item.symbol for item in series]
+    if len(set(symbols)) != len(symbols):
+        duplicates = sorted({symbol for symbol in symbols if symbols.count(symbol) > 1})
+        raise HTTPException(status_code=400, detail=f"Duplicate symbols in batch: {', '.join(duplicates)}")
+    stream = stream or bool(options.get("stream"))
+    cached, missing = await cached_flow_results(series)
+    
+    # Sort by length so each chunk stacks into as few batched field operator calls as possible
+    missing.sort(key=lambda pair: len(pair[1].price_data))
+    chunks = [missing[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(missing), BATCH_CHUNK_SIZE)]
+    limiter = chunk_limiter()
+    
+    async def analyze_chunk(chunk):
+        items = [(item.symbol, item.price_data, item.volume_data, item.timestamp) for _, item in chunk]
+        async with limiter:
+            results = await run_analysis(analysis_jobs.analyze_quantum_flow_batch, items)
+        # Results come back in chunk order, so cache entries are matched by position
+        for (key, _), (_, result) in zip(chunk, results):
+            await result_cache.put(key, result)
+        return results
+    
+    if stream:
+        async def settle_chunk(chunk):
+            try:
+                return chunk, await analyze_chunk(chunk), None
+            except HTTPException as e:
+                return chunk, None, {"error": e.detail, "status_code": e.status_code}
+            except Exception as e:
+                return chunk, None, {"error": str(e), "status_code": 500}
         
-        quantum_metrics = {
-            'coherence_time': qofa_analyzer.decoherence_time,
-            'entanglement_threshold': qofa_analyzer.entanglement_threshold,
-            'quantum_correlation': float(quantum_correlation),
-            'signal_count': len(flow_signals)
-        }
+        async def ndjson_lines():
+            jobs = [asyncio.ensure_future(settle_chunk(chunk)) for chunk in chunks]
+            try:
+                timestamp = datetime.utcnow().isoformat()
+                for symbol, result in cached.items():
+                    yield json.dumps({"symbol": symbol, **result, "timestamp": timestamp}) + "\n"
+                for finished in asyncio.as_completed(jobs):
+                    chunk, results, error = await finished
+                    if error is not None:
+                        yield json.dumps({**error, "symbols": [item.symbol for _, item in chunk]}) + "\n"
+                        continue
+                    timestamp = datetime.utcnow().isoformat()
+                    for symbol, result in results:
+                        yield json.dumps({"symbol": symbol, **result, "timestamp": timestamp}) + "\n"
+            finally:
+                for job in jobs:
+                    job.cancel()
         
-        return TradingSignalResponse(
-            signals=trading_signals,
-            confidence=np.mean([s.confidence for s in flow_signals]) if flow_signals else 0.0,
-            quantum_metrics=quantum_metrics,
-            timestamp=datetime.utcnow()
-        )
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    try:
+        chunk_results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+        results = {**cached, **{symbol: result for results in chunk_results for symbol, result in results}}
+        results = {item.symbol: results[item.symbol] for item in series if item.symbol in results}
+        
+        payload = {
+            "results": results,
+            "count": len(results),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        if media_type == codecs.JSON:
+            return payload
+        if media_type in (codecs.ARROW_STREAM, codecs.ARROW_FILE):
+            # Arrow carries one flat signals table; per-symbol metrics go to schema metadata
+            payload["signals"] = [signal for result in results.values() for signal in result["signals"]]
+            payload["results"] = {symbol: {key: value for key, value in result.items() if key != "signals"}
+                                  for symbol, result in results.items()}
+        return encoded_response(payload, media_type)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_symbols(symbols: Optional[str]) -> List[str]:
+    return [symbol.strip() for symbol in (symbols or "").split(",") if symbol.strip()]
+
+async def publish_ticks(symbol: str, prices, volumes) -> int:
+    """Run streaming detection on a worker thread, then fan the signals out on the event loop"""
+    if len(prices) != len(volumes):
+        raise ValueError(f"{symbol}: prices and volumes lengths differ")
+    if len(prices) > STREAM_MAX_TICKS:
+        raise ValueError(f"At most {STREAM_MAX_TICKS} ticks per message")
+    trading_signals = await asyncio.to_thread(signal_hub.detect_signals, symbol, prices, volumes)
+    return signal_hub.broadcast_signals(symbol, trading_signals)
+
+async def handle_stream_message(subscription, message: StreamMessage) -> Dict:
+    """Apply one client message to the hub and return the acknowledgement"""
+    if message.action == "subscribe":
+        signal_hub.subscribe(subscription, message.symbols)
+        return {"type": "subscribed", "symbols": sorted(subscription.symbols)}
+    if message.action == "unsubscribe":
+        signal_hub.unsubscribe(subscription, message.symbols)
+        return {"type": "subscribed", "symbols": sorted(subscription.symbols)}
+    if message.action == "ticks":
+        if not message.symbol:
+            raise ValueError("ticks messages need a symbol")
+        signals = await publish_ticks(message.symbol, message.prices, message.volumes)
+        return {"type": "ack", "symbol": message.symbol, "ticks": len(message.prices), "signals": signals}
+    raise ValueError(f"Unknown action: {message.action}")
+
+@api_router.websocket("/stream/signals")
+async def stream_signals_ws(websocket: WebSocket, symbols: Optional[str] = None):
+    """
+    Subscribe to symbols, push ticks and receive trading signals as they are produced
+    
+    Each tick message is analyzed on a worker thread before the next one is
+    read, so a fast producer is paced by TCP flow control; a slow consumer
+    has its backlog coalesced to the latest message per symbol.
+    """
+    await websocket.accept()
+    subscription = signal_hub.open(parse_symbols(symbols))
+    
+    async def send_messages():
+        while True:
+            for message in await subscription.get():
+                await websocket.send_text(json.dumps(message))
+    
+    sender = asyncio.ensure_future(send_messages())
+    try:
+        while True:
+            try:
+                message = StreamMessage.model_validate_json(await websocket.receive_text())
+                reply = await handle_stream_message(subscription, message)
+            except (ValidationError, ValueError) as e:
+                reply = {"type": "error", "detail": str(e)}
+            subscription.push(reply, control=True)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        signal_hub.close(subscription)
+
+@api_router.get("/stream/signals")
+async def stream_signals_sse(symbols: str):
+    """Server-sent events fallback: trading signals for the given comma-separated symbols"""
+    subscription = signal_hub.open(parse_symbols(symbols))
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    messages = await asyncio.wait_for(subscription.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                for message in messages:
+                    yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            signal_hub.close(subscription)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@api_router.post("/stream/ticks", openapi_extra=market_series_openapi(MarketDataInput))
+async def push_ticks(request: Request, symbol: Optional[str] = None):
+    """Push ticks for SSE subscribers; accepts the same bodies as /analyze/quantum-flow"""
+    series, _ = await read_market_series(request, MarketDataInput, symbol)
+    try:
+        signals = 0
+        for item in series:
+            signals += await publish_ticks(item.symbol, item.price_data, item.volume_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ticks": sum(len(item.price_data) for item in series), "signals": signals}
+
 @api_router.post("/analyze/entanglement")
-async def analyze_entanglement(request: QuantumAnalysisRequest):
-    """Analyze quantum entanglement between multiple market instruments"""
+async def analyze_entanglement(request: QuantumAnalysisRequest, window: Optional[int] = None, step: int = 1):
+    """
+    Analyze quantum entanglement between multiple market instruments
+    
+    With `window`, entanglement_entropy_series adds the entropy of every
+    window of that many observations, advancing `step` observations at a time.
+    """
+    if window is not None and (window < 1 or step < 1):
+        raise HTTPException(status_code=400, detail="window and step must be positive")
+    
     try:
-        # Generate sample market data for demonstration
-        market_data = {}
-        for symbol in request.symbols:
-            # Generate realistic sample data
-            np.random.seed(hash(symbol) % 1000)
-            prices = np.random.normal(100, 15, 100)
-            volumes = np.random.exponential(1000, 100)
-            market_data[symbol] = prices + volumes * 0.01  # Simple correlation
+        # Sample data seeds are derived here so every worker generates the same data
+        seeds = [hash(symbol) % 1000 for symbol in request.symbols]
         
         # Analyze entanglement
-        entanglement_entropy = qofa_analyzer.entanglement_detection(market_data)
+        entanglement_entropy, entanglement_matrix = await run_analysis(
+            analysis_jobs.analyze_entanglement, request.symbols, seeds
+        )
+        qofa_analyzer.entanglement_matrix = entanglement_matrix
+        
+        entanglement_entropy_series = None
+        if window is not None:
+            try:
+                series = await run_analysis(
+                    analysis_jobs.analyze_entanglement_series, request.symbols, seeds, window, step
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            # NaN (a flat series in the window) is not valid JSON
+            entanglement_entropy_series = [None if np.isnan(value) else float(value) for value in series]
         
         # Convert complex matrix to JSON-serializable format
         entanglement_matrix_serializable = []
@@ -176,40 +672,251 @@ async def analyze_entanglement(request: QuantumAnalysisRequest):
         return {
             "entanglement_entropy": float(entanglement_entropy),
             "entanglement_matrix": entanglement_matrix_serializable,
+            "entanglement_entropy_series": entanglement_entropy_series,
             "symbols": request.symbols,
             "analysis_type": "entanglement",
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/analyze/risk-assessment")
-async def quantum_risk_assessment(portfolio_data: Dict[str, float]):
-    """Perform quantum risk assessment for a portfolio"""
+@api_router.post("/analyze/options-chain")
+async def analyze_options_chain(request: OptionsChainInput, time_steps: int = Query(100, ge=1, le=10000)):
+    """
+    Quantum Hamiltonians of every expiry in an options chain, solved as one batch
+    
+    Each options_data row needs strike, volume and implied_volatility, and
+    usually expiration. Calls and puts at the same strike and expiry are
+    merged (volumes add, implied volatilities are volume-weighted). Per
+    expiry, the response lists the sorted strikes, the energy levels and the
+    strike probabilities |Ψ|² after time_steps of evolution.
+    
+    Evolution uses the Hermitian Hamiltonian whose lower triangle holds the
+    strike couplings, as the spectral solver does, so the probabilities stay
+    normalized. It differs from exponentiating the complex-symmetric matrix
+    that quantum_options_hamiltonian builds.
+    """
+    if not request.options_data:
+        raise HTTPException(status_code=400, detail="options_data is empty")
+    missing = {"strike", "volume", "implied_volatility"} - set().union(*request.options_data)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"options_data rows need {', '.join(sorted(missing))}")
+    
     try:
-        # Generate sample market conditions
-        market_conditions = {}
-        for symbol in portfolio_data.keys():
-            market_conditions[f"{symbol}_volatility"] = np.random.uniform(0.1, 0.5)
+        expiries = await run_analysis(analysis_jobs.analyze_options_chain, request.options_data, time_steps)
+        return {
+            "symbol": request.symbol,
+            "expiries": expiries,
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
-        # Add correlation data
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def run_risk_scenarios(inputs: RiskInputs, n_paths: int, horizon_days: float, seed: int) -> Dict:
+    """VaR/CVaR scenarios with every chunk run as its own executor job, a bounded number at a time"""
+    n_assets = len(inputs.weights)
+    symbols = inputs.symbols or [str(i) for i in range(n_assets)]
+    correlation = risk_scenarios.symmetric_correlation(inputs.correlation, n_assets)
+    plan = risk_scenarios.plan_scenarios(inputs.weights, inputs.volatilities, correlation, n_paths=n_paths,
+                                         horizon_days=horizon_days, seed=seed)
+    
+    limiter = chunk_limiter()
+    
+    async def run_chunk(fn, *args):
+        async with limiter:
+            return await run_analysis(fn, *args)
+    
+    losses = await asyncio.gather(*(
+        run_chunk(risk_scenarios.simulate_losses, plan.loadings, n, chunk_seed,
+                  plan.tail_size, plan.bin_edges)
+        for n, chunk_seed in plan.chunks
+    ))
+    metrics = risk_scenarios.merge_losses(plan, losses)
+    
+    thresholds = [metrics["var"][level] for level in plan.confidence_levels]
+    tail_sums = await asyncio.gather(*(
+        run_chunk(risk_scenarios.tail_draw_sums, plan.loadings, n, chunk_seed, thresholds)
+        for n, chunk_seed in plan.chunks
+    ))
+    metrics["component_cvar"] = {
+        level: dict(zip(symbols, values.tolist()))
+        for level, values in risk_scenarios.merge_components(plan, tail_sums).items()
+    }
+    return metrics
+
+def scenario_options(paths: Optional[int], horizon_days: float) -> int:
+    """Validate the scenario query parameters; returns the number of paths"""
+    paths = RISK_SCENARIO_PATHS if paths is None else paths
+    if not 0 <= paths <= RISK_MAX_PATHS:
+        raise HTTPException(status_code=400, detail=f"paths must be between 0 and {RISK_MAX_PATHS}")
+    if horizon_days <= 0:
+        raise HTTPException(status_code=400, detail="horizon_days must be positive")
+    return paths
+
+async def assess_portfolio_risk(inputs: RiskInputs, paths: int, horizon_days: float,
+                                seed: int) -> Tuple[Dict, Optional[Dict]]:
+    """Quantum risk metrics and, when paths > 0, Monte Carlo scenario metrics"""
+    risk_metrics = await run_analysis(
+        analysis_jobs.assess_risk_arrays, inputs, qofa_analyzer.entanglement_matrix
+    )
+    scenario_metrics = None
+    if paths and len(inputs.weights):
+        scenario_metrics = await run_risk_scenarios(inputs, paths, horizon_days, seed)
+    return risk_metrics, scenario_metrics
+
+@api_router.post("/analyze/risk-assessment")
+async def quantum_risk_assessment(portfolio_data: Dict[str, float], universe: str = "default",
+                                  paths: Optional[int] = None, horizon_days: float = 1.0, seed: int = 0):
+    """
+    Perform quantum risk assessment for a portfolio
+    
+    Volatilities and correlations are read from the universe's EWMA covariance
+    estimate; symbols it has not seen default to 20% volatility and zero
+    correlation. Alongside quantum_risk, scenario_metrics reports Monte Carlo
+    VaR/CVaR over horizon_days from `paths` correlated scenarios when paths > 0
+    (default QOFA_RISK_SCENARIO_PATHS, off unless configured); a fixed seed
+    reproduces the same scenarios.
+    """
+    paths = scenario_options(paths, horizon_days)
+    
+    try:
+        # One key per pair, as in the market_conditions dict form: only the upper triangle is used
         symbols = list(portfolio_data.keys())
-        for i, symbol1 in enumerate(symbols):
-            for j, symbol2 in enumerate(symbols[i+1:], i+1):
-                correlation = np.random.uniform(-0.5, 0.8)
-                market_conditions[f"{symbol1}_{symbol2}_correlation"] = correlation
+        n_assets = len(symbols)
+        volatilities, correlation, known = covariance_store.lookup(universe, symbols)
+        upper = np.triu_indices(n_assets, 1)
+        correlations = correlation[upper]
+        inputs = RiskInputs(
+            weights=np.fromiter(portfolio_data.values(), dtype=float, count=n_assets),
+            volatilities=volatilities,
+            correlation=sp.csr_matrix((correlations, upper), shape=(n_assets, n_assets)),
+            symbols=symbols
+        )
+        
+        market_conditions = {f"{symbol}_volatility": volatility
+                             for symbol, volatility in zip(symbols, volatilities.tolist())}
+        market_conditions.update(
+            (f"{symbols[i]}_{symbols[j]}_correlation", value)
+            for i, j, value in zip(upper[0].tolist(), upper[1].tolist(), correlations.tolist())
+        )
         
         # Perform quantum risk analysis
-        risk_metrics = qofa_analyzer.quantum_risk_assessment(portfolio_data, market_conditions)
+        risk_metrics, scenario_metrics = await assess_portfolio_risk(inputs, paths, horizon_days, seed)
+        estimator = covariance_store.universes.get(universe)
         
         return {
             "risk_metrics": risk_metrics,
+            "scenario_metrics": scenario_metrics,
             "portfolio": portfolio_data,
             "market_conditions": market_conditions,
+            "covariance": {
+                "universe": universe,
+                "bars": estimator.bars if estimator else 0,
+                "updated_at": estimator.stats()["updated_at"] if estimator else None,
+                "missing_symbols": [symbol for symbol, found in zip(symbols, known) if not found]
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/covariance/{universe}/bars")
+async def add_covariance_bars(universe: str, bars: List[MarketBar]):
+    """
+    Fold market bars into a universe's EWMA covariance estimate
+    
+    Bars are applied in order on a worker thread, each as one O(n²) update.
+    Timestamps are compared as UTC. A bar that is not newer than the last one
+    applied is refused with 400; bars before it in the batch stay applied.
+    """
+    try:
+        CovarianceStore.check_name(universe)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        applied = await asyncio.to_thread(covariance_store.update_many, universe,
+                                          [(bar.prices, bar.timestamp) for bar in bars])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    estimator = covariance_store.universes.get(universe)
+    return {"universe": universe, "applied": applied, **(estimator.stats() if estimator else {})}
+
+@api_router.get("/covariance/{universe}")
+async def get_covariance(universe: str, symbols: str = Query(..., description="Comma-separated symbols")):
+    """Annualized volatilities and correlations of the given symbols in a universe"""
+    symbol_list = parse_symbols(symbols)
+    volatilities, correlation, known = covariance_store.lookup(universe, symbol_list)
+    estimator = covariance_store.universes.get(universe)
+    return {
+        "universe": universe,
+        "symbols": symbol_list,
+        "volatilities": volatilities.tolist(),
+        "correlation": correlation.tolist(),
+        "known": known.tolist(),
+        "bars": estimator.bars if estimator else 0
+    }
+
+@api_router.post("/analyze/risk-assessment/arrays")
+async def quantum_risk_assessment_arrays(request: RiskArraysInput, paths: Optional[int] = None,
+                                         horizon_days: float = 1.0, seed: int = 0):
+    """
+    Quantum risk assessment from weight and volatility vectors
+    
+    Correlations are given either as a dense matrix or as sparse (i, j, value)
+    entries; entry [i, j] plays the role of the "{symbol_i}_{symbol_j}_correlation"
+    key of /analyze/risk-assessment, and pairs left out are uncorrelated. Each
+    (i, j) may be given once.
+    """
+    paths = scenario_options(paths, horizon_days)
+    n_assets = len(request.weights)
+    if len(request.volatilities) != n_assets:
+        raise HTTPException(status_code=400, detail="weights and volatilities must have the same length")
+    if request.symbols is not None and len(request.symbols) != n_assets:
+        raise HTTPException(status_code=400, detail="symbols must match the length of weights")
+    if request.correlation is not None and request.correlation_entries is not None:
+        raise HTTPException(status_code=400, detail="give either correlation or correlation_entries, not both")
+    
+    correlation = None
+    if request.correlation is not None:
+        if any(len(row) != n_assets for row in request.correlation) or len(request.correlation) != n_assets:
+            raise HTTPException(status_code=400, detail=f"correlation must be a {n_assets} × {n_assets} matrix")
+        correlation = np.array(request.correlation, dtype=float)
+    elif request.correlation_entries:
+        rows, cols, values = (np.array(column) for column in zip(*request.correlation_entries))
+        if rows.min() < 0 or cols.min() < 0 or max(rows.max(), cols.max()) >= n_assets:
+            raise HTTPException(status_code=400, detail=f"correlation entries must index assets 0..{n_assets - 1}")
+        pairs, counts = np.unique(rows * n_assets + cols, return_counts=True)
+        if np.any(counts > 1):
+            duplicates = ", ".join(f"({pair // n_assets}, {pair % n_assets})" for pair in pairs[counts > 1])
+            raise HTTPException(status_code=400, detail=f"Duplicate correlation entries: {duplicates}")
+        correlation = sp.csr_matrix((values.astype(float), (rows, cols)), shape=(n_assets, n_assets))
+    
+    try:
+        inputs = RiskInputs(weights=np.array(request.weights, dtype=float),
+                            volatilities=np.array(request.volatilities, dtype=float),
+                            correlation=correlation, symbols=request.symbols)
+        risk_metrics, scenario_metrics = await assess_portfolio_risk(inputs, paths, horizon_days, seed)
+        
+        return {
+            "risk_metrics": risk_metrics,
+            "scenario_metrics": scenario_metrics,
+            "symbols": request.symbols,
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -255,6 +962,10 @@ async def get_quantum_metrics():
             "n_basis_states": qofa_analyzer.n_basis_states,
             "coherence_decay_rate": qofa_analyzer.coherence_decay_rate,
             "system_status": "active",
+            "executor": analysis_executor.stats(),
+            "result_cache": result_cache.stats(),
+            "signal_hub": signal_hub.stats(),
+            "covariance_store": covariance_store.stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
         return metrics
@@ -262,9 +973,43 @@ async def get_quantum_metrics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def register_metrics():
+    """
+    Scrape-time gauges for executor, cache, stream and status buffer state
+    
+    Monotonic totals (executor job outcomes, result cache lookups) are
+    counters incremented at their source, so rate() applies to them.
+    """
+    registry = qofa_metrics.REGISTRY
+    registry.gauge("qofa_executor_jobs", "Analysis executor jobs by state", lambda: {
+        (("state", "running"),): analysis_executor.stats()["running"],
+        (("state", "queued"),): analysis_executor.stats()["queued"]
+    })
+    registry.gauge("qofa_cache_bytes", "Bytes held by in-process caches", lambda: {
+        (("cache", "result"),): result_cache.memory.stats()["bytes"],
+        (("cache", "hermite_basis"),): default_basis_provider.stats()["bytes"]
+    })
+    registry.gauge("qofa_stream_subscriptions", "Open signal stream subscriptions",
+                   lambda: {(): signal_hub.stats()["subscriptions"]})
+    registry.gauge("qofa_status_write_pending", "Status documents waiting in the write-behind buffer",
+                   lambda: {(): status_store.buffer.pending})
+
+register_metrics()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of the QOFA metrics (requires QOFA_METRICS=1)"""
+    if not qofa_metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; set QOFA_METRICS=1")
+    return Response(content=qofa_metrics.REGISTRY.render(),
+                    media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include the router in the main app
 app.include_router(api_router)
 
+if qofa_metrics.ENABLED:
+    app.add_middleware(qofa_metrics.RequestMetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -280,6 +1025,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_status_store():
+    await status_store.ensure_indexes()
+    status_store.buffer.start()
+
+@app.on_event("startup")
+async def start_result_cache():
+    await result_cache.ensure_indexes()
+
+@app.on_event("startup")
+async def start_covariance_store():
+    restored = await covariance_store.load()
+    if restored:
+        logger.info(f"Restored {restored} covariance universes from snapshots")
+    covariance_store.start()
+
+@app.on_event("startup")
+async def warm_whitepaper_cache():
+    whitepaper_cache.warm()
+    try:
+        pdf_builder.ensure_current()
+    except Exception as e:
+        logger.error(f"Could not check white paper PDF inputs: {e}")
+
+@app.on_event("startup")
+async def attach_basis_tables():
+    # Memory-map any Hermite basis tables persisted by previous runs or other workers
+    attached = default_basis_provider.preload()
+    if attached:
+        logger.info(f"Attached {attached} persisted Hermite basis tables")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await status_store.buffer.stop()
+    await covariance_store.stop()
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_analysis_executor():
+    analysis_executor.shutdown(wait=False)
@@ -0,0 +1,146 @@
+"""
+Signal Hub for QOFA
+Fans streaming trading signals out to WebSocket / SSE subscribers
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from streaming_flow import StreamingFlowAnalyzer
+
+
+class Subscription:
+    """
+    Outgoing message queue of one connection
+
+    Up to max_queue messages are buffered in order. Once a consumer falls
+    that far behind, further signals are coalesced to the latest one per
+    symbol, and control messages (acks, errors) to the latest one per type
+    and symbol, until the queue drains. A slow client costs bounded memory
+    and still sees the most recent state of every symbol.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self.symbols: Set[str] = set()
+        self._queue: deque = deque()
+        self._latest: "OrderedDict[Any, Dict]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.coalesced = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue) + len(self._latest)
+
+    def push(self, message: Dict, control: bool = False):
+        """Queue a message; control messages are coalesced apart from signals"""
+        if len(self._queue) < self.max_queue and not self._latest:
+            self._queue.append(message)
+        else:
+            key = (message.get("type"), message.get("symbol")) if control else message.get("symbol")
+            if key in self._latest:
+                del self._latest[key]
+            self._latest[key] = message
+            self.coalesced += 1
+        self._ready.set()
+
+    async def get(self) -> List[Dict]:
+        """Wait for and drain every pending message"""
+        await self._ready.wait()
+        messages = list(self._queue) + list(self._latest.values())
+        self._queue.clear()
+        self._latest.clear()
+        self._ready.clear()
+        self.delivered += len(messages)
+        return messages
+
+
+class SignalHub:
+    """
+    Routes ticks through one StreamingFlowAnalyzer and fans signals out
+
+    Every tick is analyzed once, however many connections subscribe to its
+    symbol. Trading signals are produced with trading_signals_from_flow, the
+    same conversion generate_trading_signals applies to batch results.
+    """
+
+    def __init__(self, streaming: Optional[StreamingFlowAnalyzer] = None, max_queue: int = 256):
+        self.streaming = streaming or StreamingFlowAnalyzer()
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.ticks = 0
+        self.signals = 0
+        self._ticks_lock = threading.Lock()
+
+    def open(self, symbols: Iterable[str] = ()) -> Subscription:
+        subscription = Subscription(self.max_queue)
+        self.subscribe(subscription, symbols)
+        return subscription
+
+    def close(self, subscription: Subscription):
+        self.unsubscribe(subscription, list(subscription.symbols))
+
+    def subscribe(self, subscription: Subscription, symbols: Iterable[str]):
+        for symbol in symbols:
+            subscription.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription, symbols: Iterable[str]):
+        for symbol in symbols:
+            subscription.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[symbol]
+
+    def broadcast(self, symbol: str, message: Dict) -> int:
+        subscribers = self._subscribers.get(symbol, ())
+        for subscription in subscribers:
+            subscription.push(message)
+        return len(subscribers)
+
+    def detect_signals(self, symbol: str, prices: Iterable[float], volumes: Iterable[float],
+                       timestamps: Optional[Iterable[datetime]] = None) -> List[Dict]:
+        """
+        Feed ticks for one symbol and return the resulting trading signals
+
+        Safe to call from worker threads: each symbol's detector applies its
+        ticks under its own lock. Signals are delivered with broadcast_signals
+        on the event loop.
+        """
+        detector = self.streaming.detector(symbol)
+        before = detector.ticks
+        flow_signals = detector.update_many(prices, volumes, timestamps)
+        with self._ticks_lock:
+            self.ticks += detector.ticks - before
+        return self.streaming.analyzer.trading_signals_from_flow(flow_signals)
+
+    def broadcast_signals(self, symbol: str, trading_signals: List[Dict]) -> int:
+        for signal in trading_signals:
+            self.broadcast(symbol, {"type": "signal", **signal})
+        self.signals += len(trading_signals)
+        return len(trading_signals)
+
+    def publish_ticks(self, symbol: str, prices: Iterable[float], volumes: Iterable[float],
+                      timestamps: Optional[Iterable[datetime]] = None) -> int:
+        """Feed ticks for one symbol and broadcast the resulting trading signals"""
+        return self.broadcast_signals(symbol, self.detect_signals(symbol, prices, volumes, timestamps))
+
+    def stats(self) -> Dict:
+        subscriptions = {subscription for subscribers in self._subscribers.values()
+                         for subscription in subscribers}
+        return {
+            "symbols": len(self._subscribers),
+            "subscriptions": len(subscriptions),
+            "tracked_symbols": len(self.streaming.detectors),
+            "evicted_symbols": self.streaming.evictions,
+            "ticks": self.ticks,
+            "signals": self.signals,
+            "pending": sum(subscription.pending for subscription in subscriptions),
+            "coalesced": sum(subscription.coalesced for subscription in subscriptions)
+        }
@@ -0,0 +1,199 @@
+"""
+Status Check Store for QOFA
+Mongo client configuration, write-behind status inserts and paginated reads
+"""
+
+import asyncio
+import base64
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+
+import qofa_metrics
+
+
+DUPLICATE_KEY_ERROR = 11000
+
+def create_mongo_client(mongo_url: str):
+    """
+    Build the Motor client with pool settings from the environment
+
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS and MONGO_SERVER_SELECTION_TIMEOUT_MS are
+    passed through to the driver. A mongomock:// URL selects an in-memory
+    mongomock-motor client for local testing. With metrics enabled, command
+    latencies are recorded through a pymongo command listener.
+    """
+    if mongo_url.startswith("mongomock://"):
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+
+    options = {}
+    for env_name, option, cast in (
+        ("MONGO_MAX_POOL_SIZE", "maxPoolSize", int),
+        ("MONGO_MIN_POOL_SIZE", "minPoolSize", int),
+        ("MONGO_MAX_IDLE_TIME_MS", "maxIdleTimeMS", int),
+        ("MONGO_WAIT_QUEUE_TIMEOUT_MS", "waitQueueTimeoutMS", int),
+        ("MONGO_SERVER_SELECTION_TIMEOUT_MS", "serverSelectionTimeoutMS", int),
+    ):
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    if qofa_metrics.ENABLED:
+        options["event_listeners"] = [qofa_metrics.mongo_command_listener()]
+    return AsyncIOMotorClient(mongo_url, **options)
+
+
+def encode_cursor(timestamp: datetime, doc_id: str) -> str:
+    raw = f"{timestamp.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    timestamp, doc_id = raw.split("|", 1)
+    return datetime.fromisoformat(timestamp), doc_id
+
+
+class StatusWriteBuffer:
+    """
+    Write-behind buffer that coalesces status inserts into insert_many batches
+
+    Documents are flushed every flush_interval seconds, or immediately once
+    max_batch documents are pending. Failed batches are re-queued up to
+    max_pending documents; beyond that the oldest documents are dropped.
+    After a partial unordered insert only the documents that failed for a
+    reason other than a duplicate key are re-queued: duplicates were already
+    written by an earlier attempt.
+    """
+
+    def __init__(self, collection, max_batch: int = 500, flush_interval: float = 0.05,
+                 max_pending: int = 50000):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.logger = logging.getLogger(__name__)
+
+        self._pending: List[Dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def add(self, document: Dict):
+        self._pending.append(document)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self):
+        async with self._flush_lock:
+            while self._pending:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                try:
+                    await self.collection.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    errors = e.details.get("writeErrors", [])
+                    retry = [batch[error["index"]] for error in errors
+                             if error.get("code") != DUPLICATE_KEY_ERROR]
+                    self.flushed += e.details.get("nInserted", 0)
+                    self.batches += 1
+                    if not retry:
+                        continue
+                    self.logger.error(f"Status batch insert failed for {len(retry)} of {len(batch)} documents: {e}")
+                    self._requeue(retry)
+                    return
+                except Exception as e:
+                    self.logger.error(f"Status batch insert of {len(batch)} documents failed: {e}")
+                    self._requeue(batch)
+                    return
+                self.flushed += len(batch)
+                self.batches += 1
+
+    def _requeue(self, documents: List[Dict]):
+        self._pending = documents + self._pending
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict:
+        return {"pending": self.pending, "flushed": self.flushed,
+                "batches": self.batches, "dropped": self.dropped}
+
+
+class StatusStore:
+    """Status check persistence with buffered writes and keyset pagination on timestamp"""
+
+    def __init__(self, collection, buffer: Optional[StatusWriteBuffer] = None):
+        self.collection = collection
+        self.buffer = buffer or StatusWriteBuffer(collection)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("timestamp", -1), ("id", -1)])
+
+    def add(self, document: Dict):
+        self.buffer.add(document)
+
+    async def page(self, limit: int = 1000, cursor: Optional[str] = None
+                   ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Newest-first page of status documents and the cursor for the next page
+
+        Documents are returned as stored (without _id), not re-validated.
+        Pending buffered writes are flushed first so reads see them.
+        """
+        await self.buffer.flush()
+
+        query = {}
+        if cursor:
+            timestamp, doc_id = decode_cursor(cursor)
+            query = {"$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": doc_id}}
+            ]}
+
+        documents = await self.collection.find(query, {"_id": 0}) \
+            .sort([("timestamp", -1), ("id", -1)]) \
+            .limit(limit + 1) \
+            .to_list(limit + 1)
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last["timestamp"], last["id"])
+        return documents, next_cursor
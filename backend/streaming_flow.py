@@ -0,0 +1,220 @@
+"""
+Streaming Options Flow Detection for QOFA
+Incremental field operator and flow detection for live tick feeds
+"""
+
+import math
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from qofa_core import QuantumOptionsFlowAnalyzer, OptionsFlowSignal
+
+
+class WindowStats:
+    """
+    Sliding-window mean and population variance (Welford updates with removal)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+    def refresh(self, values: Iterable[float]):
+        """Recompute from the window's values, discarding accumulated rounding"""
+        values = np.fromiter(values, float)
+        self.count = len(values)
+        self.mean = float(values.mean()) if self.count else 0.0
+        self._m2 = float(np.sum((values - self.mean)**2))
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class StreamingFlowDetector:
+    """
+    Per-symbol streaming counterpart of QuantumOptionsFlowAnalyzer
+
+    Each tick evaluates Ψ at the newest tick of the trailing window
+    (lookback_period ticks by default), as quantum_field_operator over that
+    window evaluated at its last sample. Only the first n_basis_states ticks
+    of the window enter the superposition and the window is normalized with
+    running mean/variance, so every update costs O(n_basis_states)
+    regardless of window length. The statistics are recomputed exactly once
+    per window length to bound drift.
+
+    The running statistics differ from NumPy's reductions in the last bits.
+    For moderate ℏ, Ψ matches the batch operator to rounding; at the default
+    ℏ the phase E·t/ℏ is of order 1e33 rad, so those bits decide the phase
+    and streaming Ψ only agrees with the batch result in distribution.
+
+    Detection mirrors detect_institutional_flow: tick t-1 is reported once
+    tick t arrives if |⟨ψ_t-1|ψ_t⟩| exceeds correlation_threshold and its
+    volume exceeds twice the window mean volume.
+    """
+
+    def __init__(self, analyzer: QuantumOptionsFlowAnalyzer, symbol: str,
+                 window: Optional[int] = None, correlation_threshold: float = 0.8):
+        self.analyzer = analyzer
+        self.symbol = symbol
+        self.window = window or analyzer.lookback_period
+        self.correlation_threshold = correlation_threshold
+        if self.window < 1:
+            raise ValueError("window must be positive")
+
+        self._prices: deque = deque(maxlen=self.window)
+        self._volumes: deque = deque(maxlen=self.window)
+        self.price_stats = WindowStats()
+        self.volume_stats = WindowStats()
+
+        # Ψ is evaluated at the last grid point, x = +√(2n+1) for windows of two or more ticks
+        edges = analyzer.basis_provider.generate(analyzer.n_basis_states, 2)
+        self._basis_first = edges[:, 0]
+        self._basis_last = edges[:, 1]
+
+        self.ticks = 0
+        self.psi: Optional[complex] = None
+        self._previous: Optional[tuple] = None
+        # Held by update_many so a symbol's ticks are applied in order from worker threads
+        self.lock = threading.Lock()
+
+    def _field_value(self) -> complex:
+        """Ψ at the newest tick of the current window"""
+        N = len(self._prices)
+        n_states = min(N, self.analyzer.n_basis_states)
+
+        prices = np.fromiter(islice(self._prices, n_states), float, n_states)
+        volumes = np.fromiter(islice(self._volumes, n_states), float, n_states)
+        normalized_price = (prices - self.price_stats.mean) / (self.price_stats.std + 1e-10)
+        normalized_volume = (volumes - self.volume_stats.mean) / (self.volume_stats.std + 1e-10)
+
+        energies = QuantumOptionsFlowAnalyzer._rolling_energies(normalized_price)
+        coefficients = np.sqrt(normalized_volume) * np.exp(1j * normalized_price)
+        basis = (self._basis_last if N > 1 else self._basis_first)[:n_states]
+        phase = energies * ((N - 1) / self.analyzer.planck_constant)
+        return complex(np.dot(coefficients * basis, np.exp(-1j * phase)))
+
+    def update(self, price: float, volume: float,
+               timestamp: Optional[datetime] = None) -> Optional[OptionsFlowSignal]:
+        """Add one tick; returns the signal for the previous tick if it was flagged"""
+        price, volume = float(price), float(volume)
+        if len(self._prices) == self.window:
+            self.price_stats.remove(self._prices[0])
+            self.volume_stats.remove(self._volumes[0])
+        self._prices.append(price)
+        self._volumes.append(volume)
+        self.ticks += 1
+        if self.ticks % self.window == 0:
+            self.price_stats.refresh(self._prices)
+            self.volume_stats.refresh(self._volumes)
+        else:
+            self.price_stats.add(price)
+            self.volume_stats.add(volume)
+
+        psi = self._field_value()
+        timestamp = timestamp or datetime.now()
+
+        signal = None
+        if self._previous is not None:
+            previous_psi, previous_price, previous_volume, previous_timestamp = self._previous
+            correlation = abs(previous_psi.conjugate() * psi)
+            if correlation > self.correlation_threshold and \
+                    previous_volume > self.volume_stats.mean * 2:
+                signal = self._signal(previous_psi, previous_price, previous_volume,
+                                      correlation, previous_timestamp)
+
+        self.psi = psi
+        self._previous = (psi, price, volume, timestamp)
+        return signal
+
+    def update_many(self, prices: Iterable[float], volumes: Iterable[float],
+                    timestamps: Optional[Iterable[datetime]] = None) -> List[OptionsFlowSignal]:
+        """Feed ticks in order and collect every emitted signal"""
+        timestamps = timestamps if timestamps is not None else iter(lambda: None, 0)
+        signals = []
+        with self.lock:
+            for price, volume, timestamp in zip(prices, volumes, timestamps):
+                signal = self.update(price, volume, timestamp)
+                if signal is not None:
+                    signals.append(signal)
+        return signals
+
+    def _signal(self, psi: complex, price: float, volume: float, correlation: float,
+                timestamp: datetime) -> OptionsFlowSignal:
+        return OptionsFlowSignal(
+            symbol=self.symbol,
+            flow_type=self.analyzer._classify_flow_type(psi, volume),
+            volume=int(volume),
+            strike=price,  # Simplified for demo, as in the request frames
+            expiration=timestamp + timedelta(days=30),
+            confidence=self.analyzer._calculate_quantum_confidence(psi),
+            quantum_correlation=correlation,
+            predicted_direction="bullish" if np.angle(psi) > 0 else "bearish",
+            timestamp=timestamp
+        )
+
+
+class StreamingFlowAnalyzer:
+    """
+    Streaming flow detectors for many symbols sharing one analyzer
+
+    At most max_symbols detectors are kept; the least recently updated symbol
+    is evicted beyond that and starts from an empty window if it returns.
+    """
+
+    def __init__(self, analyzer: Optional[QuantumOptionsFlowAnalyzer] = None,
+                 window: Optional[int] = None, correlation_threshold: float = 0.8,
+                 max_symbols: int = 10000):
+        self.analyzer = analyzer or QuantumOptionsFlowAnalyzer()
+        self.window = window
+        self.correlation_threshold = correlation_threshold
+        self.max_symbols = max_symbols
+        self.detectors: "OrderedDict[str, StreamingFlowDetector]" = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def detector(self, symbol: str) -> StreamingFlowDetector:
+        with self._lock:
+            detector = self.detectors.get(symbol)
+            if detector is not None:
+                self.detectors.move_to_end(symbol)
+                return detector
+            detector = self.detectors[symbol] = StreamingFlowDetector(
+                self.analyzer, symbol, self.window, self.correlation_threshold)
+            while len(self.detectors) > self.max_symbols:
+                self.detectors.popitem(last=False)
+                self.evictions += 1
+            return detector
+
+    def update(self, symbol: str, price: float, volume: float,
+               timestamp: Optional[datetime] = None) -> Optional[OptionsFlowSignal]:
+        return self.detector(symbol).update(price, volume, timestamp)
+
+    def reset(self, symbol: str):
+        with self._lock:
+            self.detectors.pop(symbol, None)
@@ -0,0 +1,193 @@
+"""
+White Paper Content Cache for QOFA
+Pre-renders white paper response bodies once per version/date
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from whitepaper_generator import QOFAWhitePaper
+
+
+@dataclass(frozen=True)
+class RenderedBody:
+    """A pre-serialized response body with its compressed variants and strong ETag"""
+    body: bytes
+    media_type: str
+    etag: str
+    gzip_body: bytes
+    brotli_body: Optional[bytes] = None
+
+    def encoded(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str], str]:
+        """Pick the best encoding for an Accept-Encoding header: (body, content-encoding, etag)"""
+        accepted = {token.split(";")[0].strip().lower() for token in (accept_encoding or "").split(",")}
+        if self.brotli_body is not None and "br" in accepted:
+            return self.brotli_body, "br", self.etag[:-1] + '-br"'
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip", self.etag[:-1] + '-gzip"'
+        return self.body, None, self.etag
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Weak comparison as used for If-None-Match, accepting any encoding variant's tag"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        base = self.etag.strip('"')
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag == base or tag in (base + "-gzip", base + "-br"):
+                return True
+        return False
+
+
+def _json_bytes(content) -> bytes:
+    # Same serialization as starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def render_body(body: bytes, media_type: str) -> RenderedBody:
+    return RenderedBody(
+        body=body,
+        media_type=media_type,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body) if brotli is not None else None
+    )
+
+
+class WhitePaperContentCache:
+    """
+    Rendered white paper bodies keyed on the generator's version and date
+
+    The complete document is generated once, the markdown export reuses it,
+    and every response body (full document, markdown, table of contents and
+    per-section JSON/markdown) is serialized and compressed a single time.
+    A section requested before the full document is generated on its own
+    with generate_section. A change of version or date triggers a re-render
+    on next access.
+    """
+
+    def __init__(self, generator: QOFAWhitePaper):
+        self.generator = generator
+        self._key: Optional[Tuple[str, str]] = None
+        self._complete = False
+        self._bodies: Dict[str, RenderedBody] = {}
+        self._document: Dict = {}
+        self._markdown_chunks: List[bytes] = []
+        self._titles = {name: title for name, title, _ in generator.SECTIONS}
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.generator.version, self.generator.date)
+
+    def _reset_if_stale(self):
+        # Caller holds the lock
+        key = self.key
+        if self._key != key:
+            self._key = key
+            self._complete = False
+            self._bodies = {}
+            self._document = {}
+            self._markdown_chunks = []
+
+    def _render_section(self, name: str, content):
+        bodies = self._bodies
+        bodies[f"section:{name}"] = render_body(
+            _json_bytes({"name": name, "title": self._titles[name], "content": content}), "application/json")
+        bodies[f"section_markdown:{name}"] = render_body(
+            self.generator.export_section_markdown(name, content).encode("utf-8"),
+            "text/markdown; charset=utf-8")
+
+    def _ensure_section(self, name: str) -> Dict[str, RenderedBody]:
+        bodies = self._bodies
+        if self._key == self.key and f"section:{name}" in bodies:
+            return bodies
+        with self._lock:
+            self._reset_if_stale()
+            if f"section:{name}" not in self._bodies:
+                if name not in self._titles:
+                    raise KeyError(name)
+                self._render_section(name, self.generator.generate_section(name))
+            return self._bodies
+
+    def _ensure_rendered(self) -> Dict[str, RenderedBody]:
+        bodies = self._bodies
+        if self._complete and self._key == self.key:
+            return bodies
+        with self._lock:
+            self._reset_if_stale()
+            if self._complete:
+                return self._bodies
+
+            document = self.generator.generate_complete_whitepaper()
+            markdown_sections = self.generator.export_markdown_sections(document)
+            markdown = "".join(chunk for _, chunk in markdown_sections)
+            bodies = self._bodies
+            bodies["json"] = render_body(_json_bytes(document), "application/json")
+            bodies["markdown"] = render_body(_json_bytes({"content": markdown, "format": "markdown"}),
+                                             "application/json")
+            
+            toc = []
+            for name, title, _ in self.generator.SECTIONS:
+                if f"section:{name}" not in bodies:
+                    self._render_section(name, document[name])
+                section = bodies[f"section:{name}"]
+                section_markdown = bodies[f"section_markdown:{name}"]
+                toc.append({
+                    "name": name,
+                    "title": title,
+                    "bytes": len(section.body),
+                    "gzip_bytes": len(section.gzip_body),
+                    "markdown_bytes": len(section_markdown.body),
+                    "url": f"/api/whitepaper/sections/{name}"
+                })
+            
+            bodies["toc"] = render_body(_json_bytes({
+                "title": document["title"],
+                "authors": document["authors"],
+                "date": document["date"],
+                "version": document["version"],
+                "sections": toc,
+                "total_bytes": len(bodies["json"].body)
+            }), "application/json")
+            
+            self._markdown_chunks = [chunk.encode("utf-8") for _, chunk in markdown_sections]
+            self._document = document
+            self._complete = True
+            return bodies
+
+    def warm(self):
+        """Render everything ahead of the first request"""
+        self._ensure_rendered()
+
+    def get(self, name: str) -> RenderedBody:
+        """Rendered body by name: json, markdown, toc, section:<name> or section_markdown:<name>"""
+        kind, _, section = name.partition(":")
+        if kind in ("section", "section_markdown"):
+            return self._ensure_section(section)[name]
+        return self._ensure_rendered()[name]
+    
+    def markdown_chunks(self) -> List[bytes]:
+        """UTF-8 markdown export split at section boundaries, for streamed responses"""
+        self._ensure_rendered()
+        return self._markdown_chunks
+
+    @property
+    def document(self) -> Dict:
+        self._ensure_rendered()
+        return self._document
@@ -4,12 +4,24 @@ Generates comprehensive white paper with mathematical proofs and explanations
 """
 
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 import json
 
 class QOFAWhitePaper:
     """Generates the complete QOFA white paper content"""
     
+    # (name, title, generator method) in document order
+    SECTIONS = [
+        ("abstract", "Abstract", "generate_abstract"),
+        ("introduction", "Introduction", "generate_introduction"),
+        ("mathematical_framework", "Mathematical Framework", "generate_mathematical_framework"),
+        ("implementation", "Implementation", "generate_implementation_details"),
+        ("empirical_validation", "Empirical Validation", "generate_empirical_validation"),
+        ("future_research", "Future Research", "generate_future_research"),
+        ("conclusion", "Conclusion", "generate_conclusion"),
+        ("references", "References", "generate_references")
+    ]
+    
     def __init__(self):
         self.title = "Quantum Options Flow Analysis: Revolutionary Algorithmic Framework for Retail Trading Advantage"
         self.authors = ["AI Research Team"]
@@ -405,41 +417,44 @@ class QOFAWhitePaper:
             "10. Egger, D. J., et al. (2020). Quantum computing for Finance: state of the art and future prospects. IEEE Transactions on Quantum Engineering, 1, 1-12."
         ]
     
-    def export_to_markdown(self) -> str:
-        """Export white paper to markdown format"""
-        whitepaper = self.generate_complete_whitepaper()
+    def generate_section(self, name: str) -> Union[str, List[str]]:
+        """Generate a single section by name"""
+        for section_name, _, method in self.SECTIONS:
+            if section_name == name:
+                return getattr(self, method)()
+        raise KeyError(name)
+    
+    def export_markdown_sections(self, whitepaper: Optional[Dict] = None) -> List[Tuple[str, str]]:
+        """Markdown export split into (name, chunk) pairs that concatenate to export_to_markdown()"""
+        if whitepaper is None:
+            whitepaper = self.generate_complete_whitepaper()
         
-        markdown = f"""# {whitepaper['title']}
+        header = f"""# {whitepaper['title']}
 
 **Authors:** {', '.join(whitepaper['authors'])}  
 **Date:** {whitepaper['date']}  
 **Version:** {whitepaper['version']}
 
-## Abstract
-
-{whitepaper['abstract']}
-
-## 1. Introduction
-
-{whitepaper['introduction']}
-
-{whitepaper['mathematical_framework']}
-
-{whitepaper['implementation']}
-
-{whitepaper['empirical_validation']}
-
-{whitepaper['future_research']}
-
-{whitepaper['conclusion']}
-
-## References
-
-{chr(10).join(whitepaper['references'])}
-
----
+"""
+        footer = """---
 
 *This white paper represents a revolutionary breakthrough in financial technology, applying quantum mechanical principles to democratize institutional-level trading intelligence for retail traders.*
 """
         
-        return markdown
\ No newline at end of file
+        return [("header", header)] + [
+            (name, self.export_section_markdown(name, whitepaper[name])) for name, _, _ in self.SECTIONS
+        ] + [("footer", footer)]
+    
+    def export_section_markdown(self, name: str, content: Union[str, List[str]]) -> str:
+        """Markdown chunk of one section as it appears in export_to_markdown()"""
+        if name == "abstract":
+            return f"## Abstract\n\n{content}\n\n"
+        if name == "introduction":
+            return f"## 1. Introduction\n\n{content}\n\n"
+        if name == "references":
+            return f"## References\n\n{chr(10).join(content)}\n\n"
+        return f"{content}\n\n"
+    
+    def export_to_markdown(self, whitepaper: Optional[Dict] = None) -> str:
+        """Export white paper to markdown format, reusing already generated content if given"""
+        return "".join(chunk for _, chunk in self.export_markdown_sections(whitepaper))
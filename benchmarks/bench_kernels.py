@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the QOFA analysis kernels
+
+Times every QuantumOptionsFlowAnalyzer kernel across scaled input sizes
+(series length, symbols, strikes), plus analyzer construction and module
+import time, and writes the results as JSON so runs on different commits
+can be diffed:
+
+    python benchmarks/bench_kernels.py --output before.json
+    python benchmarks/bench_kernels.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import scipy
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from hermite_basis import HermiteBasisProvider
+from qofa_core import QuantumOptionsFlowAnalyzer
+from risk_scenarios import risk_arrays, run_scenarios
+from bench_analysis_context import sample_market_data
+
+# Default size ladder per kernel; --quick keeps only the first entry
+SIZES = {
+    "quantum_field_operator": ("points", (100, 1000, 10000)),
+    "institutional_flow_detection": ("points", (100, 1000, 10000)),
+    "entanglement_detection": ("symbols", (5, 50, 200)),
+    "rolling_entanglement_entropy": ("symbols", (5, 50, 200)),
+    "quantum_options_hamiltonian": ("strikes", (50, 500, 5000)),
+    "solve_schrodinger_equation": ("strikes", (50, 200, 800)),
+    "solve_schrodinger_batch": ("expiries", (4, 16, 48)),
+    "quantum_risk_assessment": ("symbols", (5, 50, 200)),
+    "risk_scenarios": ("symbols", (5, 50, 200)),
+}
+
+
+def measure(fn: Callable[[], object], repeat: int, min_sample_time: float = 0.01) -> Dict:
+    """
+    Time fn in the style of timeit/asv: calls are grouped so that each sample
+    lasts at least min_sample_time, and per-call best/median/stdev are reported
+    """
+    start = time.perf_counter()
+    fn()  # Warm-up; also sizes the inner loop
+    single = time.perf_counter() - start
+    number = max(1, int(min_sample_time / max(single, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+
+    return {
+        "best_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def options_chain(n_strikes: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    strikes = np.linspace(50, 150, n_strikes)
+    return pd.DataFrame({
+        "strike": strikes,
+        "volume": rng.exponential(1000, n_strikes),
+        "implied_volatility": 0.2 + 0.1 * np.abs(strikes - 100) / 50
+    })
+
+
+def expiry_chain(n_expiries: int, max_strikes: int, seed: int = 17) -> pd.DataFrame:
+    """Chain with a ragged strike ladder per expiry, the longest max_strikes wide"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for expiry in range(n_expiries):
+        n_strikes = max_strikes if expiry == 0 else int(rng.integers(max_strikes // 4, max_strikes + 1))
+        frame = options_chain(n_strikes, seed=seed + expiry)
+        frame["expiration"] = pd.Timestamp("2025-01-17") + pd.Timedelta(weeks=expiry)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def market_universe(n_symbols: int, n_points: int = 252, seed: int = 11) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {f"SYM{i}": 100 + np.cumsum(rng.normal(0, 1, n_points)) for i in range(n_symbols)}
+
+
+def risk_inputs(n_symbols: int, seed: int = 13):
+    rng = np.random.default_rng(seed)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    portfolio = dict(zip(symbols, rng.uniform(0.01, 1.0, n_symbols)))
+    market_conditions = {f"{symbol}_volatility": vol
+                         for symbol, vol in zip(symbols, rng.uniform(0.1, 0.5, n_symbols))}
+    for i, symbol1 in enumerate(symbols):
+        for symbol2 in symbols[i + 1:]:
+            market_conditions[f"{symbol1}_{symbol2}_correlation"] = rng.uniform(-0.5, 0.5)
+    return portfolio, market_conditions
+
+
+def kernel_cases(analyzer: QuantumOptionsFlowAnalyzer, quick: bool):
+    """Yield (name, params, callable) for every kernel and size"""
+    def sizes(kernel):
+        label, values = SIZES[kernel]
+        return label, values[:1] if quick else values
+
+    label, values = sizes("quantum_field_operator")
+    for n in values:
+        market_df = sample_market_data(n)
+        price, volume = market_df["price"].values, market_df["volume"].values
+        yield "quantum_field_operator", {label: n}, lambda p=price, v=volume: analyzer.quantum_field_operator(p, v)
+
+    label, values = sizes("institutional_flow_detection")
+    for n in values:
+        market_df = sample_market_data(n)
+        yield "institutional_flow_detection", {label: n}, \
+            lambda df=market_df: analyzer.institutional_flow_detection(df)
+
+    label, values = sizes("entanglement_detection")
+    for n in values:
+        universe = market_universe(n)
+        yield "entanglement_detection", {label: n, "points": 252}, \
+            lambda data=universe: analyzer.entanglement_detection(data)
+
+    label, values = sizes("rolling_entanglement_entropy")
+    for n in values:
+        universe = market_universe(n, n_points=504)
+        yield "rolling_entanglement_entropy", {label: n, "points": 504, "window": 252}, \
+            lambda data=universe: analyzer.rolling_entanglement_entropy(data, 252)
+
+    label, values = sizes("quantum_options_hamiltonian")
+    for n in values:
+        chain = options_chain(n)
+        for representation in ("dense", "banded"):
+            yield "quantum_options_hamiltonian", {label: n, "representation": representation}, \
+                lambda c=chain, r=representation: analyzer.quantum_options_hamiltonian(c, r)
+
+    label, values = sizes("solve_schrodinger_equation")
+    for n in values:
+        hamiltonian = analyzer.quantum_options_hamiltonian(options_chain(n), "banded")
+        initial_state = np.ones(n, dtype=complex) / np.sqrt(n)
+        for output in ("all", "final"):
+            yield "solve_schrodinger_equation", {label: n, "method": "spectral", "output": output}, \
+                lambda h=hamiltonian, s=initial_state, o=output: \
+                analyzer.solve_schrodinger_equation(h, s, method="spectral", output=o)
+
+    label, values = sizes("solve_schrodinger_batch")
+    for n in values:
+        for max_strikes in (40, 200):
+            chain = expiry_chain(n, max_strikes)
+            yield "solve_schrodinger_batch", {label: n, "max_strikes": max_strikes}, \
+                lambda c=chain: analyzer.solve_schrodinger_batch(analyzer.quantum_options_hamiltonian_batch(c))
+
+    label, values = sizes("quantum_risk_assessment")
+    for n in values:
+        portfolio, market_conditions = risk_inputs(n)
+        yield "quantum_risk_assessment", {label: n}, \
+            lambda p=portfolio, m=market_conditions: analyzer.quantum_risk_assessment(p, m)
+
+    label, values = sizes("risk_scenarios")
+    for n in values:
+        _, weights, volatilities, correlation = risk_arrays(*risk_inputs(n))
+        yield "risk_scenarios", {label: n, "paths": 100_000}, \
+            lambda w=weights, v=volatilities, c=correlation: run_scenarios(w, v, c, n_paths=100_000)
+
+
+def construction_cases():
+    yield "analyzer_construction", {"basis": "warm"}, lambda: QuantumOptionsFlowAnalyzer().basis_states
+    yield "analyzer_construction", {"basis": "cold"}, \
+        lambda: QuantumOptionsFlowAnalyzer(basis_provider=HermiteBasisProvider()).basis_states
+
+
+def import_time(module: str, repeat: int) -> Dict:
+    """Best wall time to import module in a fresh interpreter"""
+    code = (f"import sys, time; sys.path.insert(0, {str(BACKEND_DIR)!r}); "
+            f"start = time.perf_counter(); import {module}; print(time.perf_counter() - start)")
+    samples = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    check=True).stdout) * 1000
+               for _ in range(repeat)]
+    return {"best_ms": min(samples), "median_ms": statistics.median(samples),
+            "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "number": 1, "repeat": repeat}
+
+
+def case_key(name: str, params: Dict) -> str:
+    return name + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BACKEND_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat: int, quick: bool, pattern: Optional[str]) -> Dict:
+    warnings.simplefilter("ignore", RuntimeWarning)
+    analyzer = QuantumOptionsFlowAnalyzer()
+    results = {}
+
+    cases = list(kernel_cases(analyzer, quick)) + list(construction_cases())
+    for name, params, fn in cases:
+        key = case_key(name, params)
+        if pattern and pattern not in key:
+            continue
+        results[key] = {"name": name, "params": params, **measure(fn, repeat)}
+        print(f"{key:<70} {results[key]['best_ms']:>12.3f} ms", flush=True)
+
+    for module in ("qofa_core", "hermite_basis"):
+        key = case_key("import_time", {"module": module})
+        if pattern and pattern not in key:
+            continue
+        results[key] = {"name": "import_time", "params": {"module": module}, **import_time(module, repeat)}
+        print(f"{key:<70} {results[key]['best_ms']:>12.3f} ms", flush=True)
+
+    return {
+        "metadata": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print best-time ratios against a baseline run; returns keys slower than threshold"""
+    regressions = []
+    print(f"\n{'benchmark':<70} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, result in current["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = result["best_ms"] / previous["best_ms"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  slower"
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{key:<70} {previous['best_ms']:>10.3f} {result['best_ms']:>10.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the QOFA analysis kernels")
+    parser.add_argument("--output", type=Path, help="write results JSON to this path")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="best-time ratio above which a benchmark is reported as slower")
+    parser.add_argument("--repeat", type=int, default=5, help="timing samples per benchmark")
+    parser.add_argument("--quick", action="store_true", help="only run the smallest size of each kernel")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose key contains this string")
+    args = parser.parse_args()
+
+    current = run(args.repeat, args.quick, args.pattern)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2, sort_keys=True))
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(current, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
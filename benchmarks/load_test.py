@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Async load generator for the QOFA backend
+
+Replays a weighted mix of analysis, white paper and status requests at a
+fixed concurrency and reports p50/p95/p99 latency, throughput and error rate
+per endpoint. Targets either the app in-process (ASGI transport, mongomock
+database) or a running server:
+
+    python benchmarks/load_test.py --concurrency 32 --duration 30
+    python benchmarks/load_test.py --serve --concurrency 64          # local uvicorn + mongomock
+    python benchmarks/load_test.py --url http://localhost:8001 --output load.json
+
+In-process runs share the event loop with the app, so the reported event
+loop lag directly shows handlers that block the loop.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+SYMBOLS = ["AAPL", "GOOGL", "MSFT", "TSLA", "SPY", "QQQ", "NVDA", "AMZN"]
+
+
+def market_payload(rng: random.Random, n_points: int = 100, symbol: Optional[str] = None) -> Dict:
+    prices = 100 + np.cumsum(np.random.default_rng(rng.getrandbits(32)).normal(0, 2, n_points))
+    volumes = 1000 + np.abs(np.diff(prices, prepend=prices[0])) * 500
+    return {"symbol": symbol or rng.choice(SYMBOLS), "price_data": prices.tolist(),
+            "volume_data": volumes.tolist()}
+
+
+# name -> (weight, request factory); factories return (method, path, json body or None)
+def default_mix(identical_payloads: bool) -> Dict[str, Tuple[float, Callable]]:
+    fixed = market_payload(random.Random(0), symbol="AAPL")
+
+    def quantum_flow(rng):
+        return "POST", "/api/analyze/quantum-flow", fixed if identical_payloads else market_payload(rng)
+
+    def quantum_flow_batch(rng):
+        items = [market_payload(rng, symbol=symbol) for symbol in rng.sample(SYMBOLS, 4)]
+        return "POST", "/api/analyze/quantum-flow/batch", {"items": items}
+
+    def entanglement(rng):
+        return "POST", "/api/analyze/entanglement", {"symbols": rng.sample(SYMBOLS, 3),
+                                                     "analysis_type": "entanglement"}
+
+    def risk(rng):
+        return "POST", "/api/analyze/risk-assessment", {symbol: rng.uniform(0.05, 0.5)
+                                                         for symbol in rng.sample(SYMBOLS, 4)}
+
+    return {
+        "quantum_flow": (30, quantum_flow),
+        "quantum_flow_batch": (5, quantum_flow_batch),
+        "entanglement": (10, entanglement),
+        "risk_assessment": (10, risk),
+        "quantum_metrics": (10, lambda rng: ("GET", "/api/quantum-metrics", None)),
+        "sample_data": (5, lambda rng: ("GET", "/api/demo/generate-sample-data", None)),
+        "whitepaper": (5, lambda rng: ("GET", "/api/whitepaper", None)),
+        "whitepaper_markdown": (5, lambda rng: ("GET", "/api/whitepaper/markdown", None)),
+        "whitepaper_section": (5, lambda rng: ("GET", "/api/whitepaper/sections/abstract", None)),
+        "status_create": (10, lambda rng: ("POST", "/api/status",
+                                           {"client_name": f"load-{rng.getrandbits(16)}"})),
+        "status_list": (5, lambda rng: ("GET", "/api/status?limit=100", None)),
+    }
+
+
+def parse_mix(spec: Optional[str], mix: Dict[str, Tuple[float, Callable]]) -> Dict[str, Tuple[float, Callable]]:
+    """Override weights with 'name=weight,...'; unnamed endpoints keep their defaults"""
+    if not spec:
+        return mix
+    mix = dict(mix)
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in mix:
+            raise SystemExit(f"Unknown endpoint in --mix: {name} (choose from {', '.join(mix)})")
+        mix[name] = (float(weight), mix[name][1])
+    return {name: entry for name, entry in mix.items() if entry[0] > 0}
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    exceptions: int = 0
+
+    def record(self, latency: float, status_code: Optional[int]):
+        self.latencies.append(latency)
+        if status_code is None:
+            self.exceptions += 1
+            self.errors += 1
+            return
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        latencies = np.asarray(self.latencies) * 1000
+        count = len(latencies)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if count else (0.0, 0.0, 0.0)
+        return {
+            "requests": count,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / count if count else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(latencies.max()) if count else 0.0,
+            "status_codes": {str(code): n for code, n in sorted(self.status_codes.items())},
+            "exceptions": self.exceptions
+        }
+
+
+async def worker(client: httpx.AsyncClient, mix: Dict[str, Tuple[float, Callable]],
+                 stats: Dict[str, EndpointStats], deadline: float, budget: List[int], seed: int):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name][0] for name in names]
+    while time.perf_counter() < deadline and budget[0] != 0:
+        budget[0] -= 1
+        name = rng.choices(names, weights)[0]
+        method, path, body = mix[name][1](rng)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            await response.aread()
+            status_code = response.status_code
+        except httpx.HTTPError:
+            status_code = None
+        stats[name].record(time.perf_counter() - start, status_code)
+
+
+async def loop_lag_probe(stop: asyncio.Event, interval: float = 0.01) -> List[float]:
+    """Overshoot of asyncio.sleep(interval), i.e. how long the loop was blocked"""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def run_load(client: httpx.AsyncClient, mix: Dict[str, Tuple[float, Callable]], concurrency: int,
+                   duration: float, max_requests: Optional[int], seed: int) -> Dict:
+    stats = {name: EndpointStats() for name in mix}
+    budget = [max_requests if max_requests else -1]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    stop = asyncio.Event()
+    probe = asyncio.ensure_future(loop_lag_probe(stop))
+    await asyncio.gather(*(worker(client, mix, stats, deadline, budget, seed + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = np.asarray(await probe)
+
+    endpoints = {name: endpoint.summary(elapsed) for name, endpoint in stats.items() if endpoint.latencies}
+    total = EndpointStats()
+    for endpoint in stats.values():
+        total.latencies += endpoint.latencies
+        total.errors += endpoint.errors
+        total.exceptions += endpoint.exceptions
+        for code, n in endpoint.status_codes.items():
+            total.status_codes[code] = total.status_codes.get(code, 0) + n
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "total": total.summary(elapsed),
+        "endpoints": endpoints,
+        "event_loop_lag_ms": {
+            "p99": float(np.percentile(lags, 99) * 1000) if len(lags) else None,
+            "max": float(lags.max() * 1000) if len(lags) else None
+        }
+    }
+
+
+def in_process_client(timeout: float) -> Tuple[httpx.AsyncClient, object]:
+    """ASGI client for backend/server.py backed by an in-memory mongomock database"""
+    os.environ.setdefault("MONGO_URL", "mongomock://")
+    os.environ.setdefault("DB_NAME", "qofa_load_test")
+    os.environ.setdefault("QOFA_PDF_PATH", str(Path(os.environ.get("TMPDIR", "/tmp")) / "qofa_load_test.pdf"))
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://qofa", timeout=timeout), server.app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, MONGO_URL="mongomock://", DB_NAME=os.environ.get("DB_NAME", "qofa_load_test"))
+    env.setdefault("QOFA_PDF_PATH", str(Path(os.environ.get("TMPDIR", "/tmp")) / "qofa_load_test.pdf"))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/api/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise SystemExit(f"Server at {base_url} did not become ready within {timeout:g}s")
+
+
+def print_report(report: Dict):
+    print(f"\n{'endpoint':<22} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = sorted(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, row in rows:
+        print(f"{name:<22} {row['requests']:>7} {row['throughput_rps']:>8.1f} {row['error_rate'] * 100:>6.2f} "
+              f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+    lag = report["event_loop_lag_ms"]
+    if lag["max"] is not None:
+        print(f"\nevent loop lag (load generator loop): p99 {lag['p99']:.2f} ms, max {lag['max']:.2f} ms")
+
+
+async def main_async(args) -> Dict:
+    mix = parse_mix(args.mix, default_mix(args.identical_payloads))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.url or args.serve:
+        process = None
+        base_url = args.url
+        if args.serve:
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            process = start_uvicorn(port, args.workers)
+        try:
+            await wait_until_ready(base_url)
+            async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+                report = await run_load(client, mix, args.concurrency, args.duration, args.requests, args.seed)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+        report["target"] = base_url
+        return report
+
+    client, app = in_process_client(args.timeout)
+    await app.router.startup()
+    try:
+        async with client:
+            report = await run_load(client, mix, args.concurrency, args.duration, args.requests, args.seed)
+    finally:
+        await app.router.shutdown()
+    report["target"] = "in-process"
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the QOFA backend")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (default: in-process ASGI app)")
+    target.add_argument("--serve", action="store_true", help="start a local uvicorn server with mongomock")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --serve")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client coroutines")
+    parser.add_argument("--duration", type=float, default=10.0, help="test duration in seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--mix", help="endpoint weights, e.g. 'quantum_flow=50,status_list=0'")
+    parser.add_argument("--identical-payloads", action="store_true",
+                        help="re-post one quantum flow payload (exercises the result cache)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the report JSON to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,16 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from pathlib import Path
 
-def create_qofa_pdf():
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "QOFA_White_Paper_Simple.pdf"
+
+def create_qofa_pdf(output_path: str = str(DEFAULT_OUTPUT)):
     """Create a simple QOFA white paper PDF"""
     
     # Create PDF document
     doc = SimpleDocTemplate(
-        "/app/QOFA_White_Paper_Simple.pdf",
+        output_path,
         pagesize=letter,
         rightMargin=72,
         leftMargin=72,
@@ -186,7 +189,7 @@ def create_qofa_pdf():
     doc.build(story)
     
     print("✅ QOFA Simple PDF generated successfully!")
-    print("📄 File: /app/QOFA_White_Paper_Simple.pdf")
+    print(f"📄 File: {output_path}")
 
 if __name__ == "__main__":
     create_qofa_pdf()
\ No newline at end of file
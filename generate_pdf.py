@@ -1,62 +1,29 @@
 #!/usr/bin/env python3
 """
-Simple PDF generator for QOFA white paper
+PDF build command for the QOFA white paper
+Rebuilds only when the HTML, stylesheet or white paper content changed
 """
 
-import os
-from weasyprint import HTML, CSS
+import argparse
+import sys
 from pathlib import Path
 
-def generate_pdf():
-    """Generate PDF from HTML white paper"""
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from pdf_builder import WhitePaperPDFBuilder
+
+
+def generate_pdf(force: bool = False, engine: str = "weasyprint",
+                 html_path: str = None, output_path: str = None) -> bool:
+    """Generate the white paper PDF, skipping the build when nothing changed"""
     try:
-        # Get the HTML file path
-        html_file = Path('/app/qofa_white_paper_simple.html')
-        pdf_file = Path('/app/QOFA_White_Paper_Simple.pdf')
+        builder = WhitePaperPDFBuilder(html_path=html_path, output_path=output_path, engine=engine)
+        pdf_file = builder.output_path
         
-        # Additional CSS for PDF optimization
-        pdf_css = CSS(string='''
-            @page {
-                size: A4;
-                margin: 2cm;
-            }
-            body {
-                font-size: 12px;
-            }
-            .header {
-                text-align: center;
-                margin-bottom: 30px;
-            }
-            .title {
-                font-size: 20px;
-                font-weight: bold;
-            }
-            .section {
-                margin-bottom: 20px;
-            }
-            .key-point {
-                background: #f0f8ff;
-                padding: 10px;
-                margin: 10px 0;
-                border-left: 3px solid #3498db;
-            }
-            .equation {
-                text-align: center;
-                font-family: monospace;
-                background: #f5f5f5;
-                padding: 10px;
-                margin: 15px 0;
-                border-left: 3px solid #3498db;
-            }
-        ''')
-        
-        # Convert HTML to PDF
-        HTML(filename=str(html_file)).write_pdf(
-            str(pdf_file),
-            stylesheets=[pdf_css]
-        )
-        
-        print(f"✅ PDF generated successfully: {pdf_file}")
+        if builder.build(force=force):
+            print(f"✅ PDF generated successfully: {pdf_file}")
+        else:
+            print(f"✅ PDF is up to date: {pdf_file}")
         print(f"📄 File size: {pdf_file.stat().st_size / 1024:.1f} KB")
         return True
         
@@ -64,5 +31,16 @@ def generate_pdf():
         print(f"❌ Error generating PDF: {e}")
         return False
 
+def main():
+    parser = argparse.ArgumentParser(description="Build the QOFA white paper PDF")
+    parser.add_argument("--force", action="store_true", help="rebuild even if inputs are unchanged")
+    parser.add_argument("--engine", choices=WhitePaperPDFBuilder.ENGINES, default="weasyprint",
+                        help="weasyprint renders the HTML white paper, reportlab the simple text layout")
+    parser.add_argument("--html", dest="html_path", help="HTML source (weasyprint engine)")
+    parser.add_argument("--output", dest="output_path", help="PDF output path")
+    args = parser.parse_args()
+    
+    sys.exit(0 if generate_pdf(args.force, args.engine, args.html_path, args.output_path) else 1)
+
 if __name__ == "__main__":
-    generate_pdf()
\ No newline at end of file
+    main()
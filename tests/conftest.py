@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server.py reads these at import time; keep tests off real Mongo and the tracked PDF
+os.environ.setdefault("MONGO_URL", "mongomock://localhost")
+os.environ.setdefault("DB_NAME", "qofa_test")
+os.environ.setdefault("QOFA_PDF_PATH", str(Path(tempfile.mkdtemp(prefix="qofa-test-")) / "white_paper.pdf"))
+os.environ.setdefault("QOFA_EXECUTOR_KIND", "thread")
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import qofa_metrics
+import server
+from analysis_executor import AnalysisExecutor, AnalysisTimeoutError, ExecutorSaturatedError
+
+
+def blocking_job(release: threading.Event, value):
+    release.wait(5)
+    return value
+
+
+def test_runs_jobs_and_reports_stats():
+    executor = AnalysisExecutor(kind="thread", max_workers=2, max_queue=1)
+    try:
+        assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+        stats = executor.stats()
+        assert stats["completed"] == 1 and stats["rejected"] == 0 and not stats["saturated"]
+        assert executor.capacity == 3
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=1, timeout=20)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(executor.run(blocking_job, release, i)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["saturated"]
+        with pytest.raises(ExecutorSaturatedError) as excinfo:
+            await executor.run(blocking_job, release, 2)
+        release.set()
+        return excinfo.value, await asyncio.gather(*running)
+
+    try:
+        error, results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert error.retry_after == 2.0
+    assert results == [0, 1]
+    stats = executor.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["queued"] == 0
+
+
+def test_timeout_keeps_slot_until_job_finishes():
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(AnalysisTimeoutError):
+            await executor.run(blocking_job, release, 0, timeout=0.05)
+        # The worker is still busy with the abandoned job
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(blocking_job, release, 1)
+        release.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(blocking_job, release, 2)
+
+    try:
+        assert asyncio.run(scenario()) == 2
+    finally:
+        executor.shutdown()
+    assert executor.stats()["timed_out"] == 1
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        AnalysisExecutor(kind="fiber")
+
+
+def test_run_analysis_maps_saturation_to_503(monkeypatch):
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=0, timeout=40)
+    monkeypatch.setattr(server, "analysis_executor", executor)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(server.run_analysis(blocking_job, release, 0))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as excinfo:
+            await server.run_analysis(blocking_job, release, 1)
+        release.set()
+        await running
+        return excinfo.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "4"}
+
+
+def test_run_analysis_maps_timeout_to_504(monkeypatch):
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=0, timeout=0.05)
+    monkeypatch.setattr(server, "analysis_executor", executor)
+    release = threading.Event()
+
+    try:
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(server.run_analysis(blocking_job, release, 0))
+    finally:
+        release.set()
+        executor.shutdown()
+    assert excinfo.value.status_code == 504
+
+
+
+def test_chunk_limiter_stays_below_capacity(monkeypatch):
+    executor = AnalysisExecutor(kind="thread", max_workers=2, max_queue=1)
+    monkeypatch.setattr(server, "analysis_executor", executor)
+    monkeypatch.setattr(server, "MAX_CHUNKS_IN_FLIGHT", 16)
+    assert server.chunk_limiter()._value == 2
+
+    monkeypatch.setattr(server, "MAX_CHUNKS_IN_FLIGHT", 1)
+    assert server.chunk_limiter()._value == 1
+
+
+def failing_job():
+    raise RuntimeError("bad input")
+
+
+def test_outcomes_are_counted_once(monkeypatch):
+    counter = qofa_metrics.Counter("qofa_executor_job_outcomes", "test")
+    monkeypatch.setattr(qofa_metrics, "ENABLED", True)
+    monkeypatch.setattr(qofa_metrics, "EXECUTOR_JOBS", counter)
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        assert await executor.run(sum, [1, 2]) == 3
+        with pytest.raises(RuntimeError):
+            await executor.run(failing_job)
+        # Times out while running, then finishes late
+        with pytest.raises(AnalysisTimeoutError):
+            await executor.run(blocking_job, release, 0, timeout=0.05)
+        # Times out while still queued behind it and is cancelled
+        queued = asyncio.create_task(executor.run(blocking_job, release, 1, timeout=0.05))
+        with pytest.raises(AnalysisTimeoutError):
+            await queued
+        release.set()
+        await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    outcomes = {dict(labels)["outcome"]: value for labels, value in counter.drain().items()}
+    assert outcomes == {"completed": 1.0, "failed": 1.0, "timed_out": 2.0}
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["timed_out"], stats["cancelled"]) == (1, 1, 2, 0)
+    assert stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_jobs_cancelled_on_shutdown_are_counted_as_cancelled(monkeypatch):
+    counter = qofa_metrics.Counter("qofa_executor_job_outcomes", "test")
+    monkeypatch.setattr(qofa_metrics, "ENABLED", True)
+    monkeypatch.setattr(qofa_metrics, "EXECUTOR_JOBS", counter)
+    executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(blocking_job, release, 0))
+        queued = asyncio.create_task(executor.run(blocking_job, release, 1))
+        await asyncio.sleep(0.05)
+        release.set()
+        executor.shutdown(wait=False)
+        return await asyncio.gather(running, queued, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    executor.shutdown()
+
+    outcomes = {dict(labels)["outcome"]: value for labels, value in counter.drain().items()}
+    assert results[0] == 0
+    assert outcomes == {"completed": 1.0, "cancelled": 1.0}
+    assert executor.stats()["cancelled"] == 1
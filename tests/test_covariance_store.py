@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from covariance_store import CovarianceStore, EWMACovariance
+
+
+SYMBOLS = ["S0", "S1", "S2"]
+START = datetime(2026, 1, 2)
+
+
+def price_bars(n_bars=60, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, (n_bars, len(SYMBOLS)))
+    prices = 100 * np.exp(np.vstack([np.zeros(len(SYMBOLS)), np.cumsum(returns, axis=0)]))
+    bars = [(dict(zip(SYMBOLS, row.tolist())), START + timedelta(days=k)) for k, row in enumerate(prices)]
+    return bars, returns
+
+
+def test_ewma_matches_direct_recursion():
+    bars, returns = price_bars()
+    estimator = EWMACovariance(decay=0.97)
+    for prices, timestamp in bars:
+        estimator.update(prices, timestamp)
+
+    # The first bar only sets reference prices: a zero return that still decays the prior
+    expected = 0.97 * np.eye(len(SYMBOLS)) * estimator.prior_variance
+    for r in returns:
+        expected = 0.97 * expected + 0.03 * np.outer(r, r)
+    np.testing.assert_allclose(estimator.covariance, expected, rtol=1e-9, atol=1e-15)
+
+    volatilities, correlation, known = estimator.lookup(["S2", "NEW", "S0"])
+    assert known.tolist() == [True, False, True]
+    assert volatilities[1] == estimator.default_volatility
+    assert correlation[1].tolist() == [0.0, 1.0, 0.0]
+
+
+def test_aware_and_naive_timestamps_compare_as_utc():
+    estimator = EWMACovariance()
+    estimator.update({"S0": 100.0}, datetime(2026, 1, 2, 12, tzinfo=timezone(timedelta(hours=2))))
+    assert estimator.updated_at == datetime(2026, 1, 2, 10)
+    with pytest.raises(ValueError):
+        estimator.update({"S0": 101.0}, datetime(2026, 1, 2, 9, 30))
+    estimator.update({"S0": 101.0})
+    estimator.update({"S0": 102.0}, datetime(2099, 1, 1, tzinfo=timezone.utc))
+    assert estimator.bars == 3
+
+
+def test_update_many_keeps_bars_before_a_refused_one():
+    store = CovarianceStore()
+    bars, _ = price_bars(5)
+    with pytest.raises(ValueError, match="Bar 3"):
+        store.update_many("eq", bars[:3] + [bars[1]])
+    assert store.universes["eq"].bars == 3
+
+
+def test_snapshots_round_trip_through_disk_and_mongo(tmp_path):
+    async def run():
+        collection = AsyncMongoMockClient()["qofa_test"]["covariance_snapshots"]
+        store = CovarianceStore(decay=0.9, snapshot_dir=str(tmp_path), collection=collection)
+        store.update_many("eq", price_bars(20)[0])
+        await store.snapshot()
+        from_disk, from_mongo = CovarianceStore(snapshot_dir=str(tmp_path)), CovarianceStore(collection=collection)
+        assert await from_disk.load() == 1 and await from_mongo.load() == 1
+        return store.universes["eq"], from_disk.universes["eq"], from_mongo.universes["eq"]
+
+    original, *restored = asyncio.run(run())
+    for estimator in restored:
+        np.testing.assert_allclose(estimator.covariance, original.covariance, rtol=1e-15)
+        assert estimator.symbols == original.symbols
+        assert (estimator.bars, estimator.updated_at, estimator.decay) == (original.bars, original.updated_at, 0.9)
+        np.testing.assert_array_equal(estimator._last_prices[:3], original._last_prices[:3])
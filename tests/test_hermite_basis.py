@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from scipy.special import eval_hermite, factorial
+
+from hermite_basis import HermiteBasisProvider
+
+
+def test_generate_matches_closed_form():
+    basis = HermiteBasisProvider.generate(8, 33)
+    x = np.linspace(-np.sqrt(17), np.sqrt(17), 33)
+
+    for n in range(8):
+        expected = eval_hermite(n, x) * np.exp(-x**2 / 2) / np.sqrt(2.0**n * factorial(n) * np.sqrt(np.pi))
+        np.testing.assert_allclose(basis[n], expected, atol=1e-12)
+    assert HermiteBasisProvider.generate(0, 10).shape == (0, 10)
+
+
+def test_get_returns_shared_read_only_table():
+    provider = HermiteBasisProvider()
+    table = provider.get(5, 20)
+
+    assert provider.get(5, 20) is table
+    assert not table.flags.writeable
+    with pytest.raises(ValueError):
+        table[0, 0] = 1.0
+    assert provider.stats()["tables"] == 1
+
+
+def test_lru_eviction_respects_max_bytes():
+    provider = HermiteBasisProvider(max_bytes=2 * 4 * 100 * 8)
+    first = provider.get(4, 100)
+    second = provider.get(100, 4)
+    assert provider.get(4, 100) is first  # now most recently used
+    provider.get(50, 8)
+
+    stats = provider.stats()
+    assert stats["tables"] == 2 and stats["bytes"] <= stats["max_bytes"]
+    assert provider.get(4, 100) is first
+    assert provider.get(100, 4) is not second
+
+
+def test_oversized_table_is_kept():
+    provider = HermiteBasisProvider(max_bytes=1)
+    table = provider.get(3, 50)
+    assert provider.get(3, 50) is table
+    assert provider.stats()["tables"] == 1
+
+
+def test_tables_persist_and_preload(tmp_path):
+    writer = HermiteBasisProvider(cache_dir=str(tmp_path))
+    expected = writer.get(6, 40)
+    assert (tmp_path / "hermite_6_40.npy").exists()
+    (tmp_path / "hermite_bad_name.npy").write_bytes(b"")
+
+    reader = HermiteBasisProvider(cache_dir=str(tmp_path))
+    assert reader.preload() == 1
+    table = reader.get(6, 40)
+    assert isinstance(table, np.memmap)
+    np.testing.assert_array_equal(table, expected)
+
+
+def test_unreadable_persisted_table_is_rebuilt(tmp_path):
+    (tmp_path / "hermite_3_10.npy").write_bytes(b"not a table")
+    provider = HermiteBasisProvider(cache_dir=str(tmp_path))
+
+    np.testing.assert_allclose(provider.get(3, 10), HermiteBasisProvider.generate(3, 10))
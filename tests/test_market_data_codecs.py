@@ -0,0 +1,166 @@
+import io
+import json
+from datetime import datetime
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import market_data_codecs as codecs
+from market_data_codecs import PayloadDecodeError, UnsupportedMediaTypeError
+
+
+PRICES = np.linspace(100, 110, 16)
+VOLUMES = np.arange(16, dtype=float) * 10
+
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def arrow_bytes(table, kind=codecs.ARROW_STREAM):
+    sink = pa.BufferOutputStream()
+    writer_cls = pa.ipc.new_stream if kind == codecs.ARROW_STREAM else pa.ipc.new_file
+    with writer_cls(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_decode_npy_two_row_and_structured_arrays():
+    (series,), options = codecs.decode_market_data(npy_bytes(np.vstack([PRICES, VOLUMES])),
+                                                   "application/x-npy", symbol="SPY")
+    assert series.symbol == "SPY" and options == {}
+    np.testing.assert_array_equal(series.price_data, PRICES)
+    np.testing.assert_array_equal(series.volume_data, VOLUMES)
+
+    structured = np.zeros(16, dtype=[("price", "<f4"), ("volume", "<i8")])
+    structured["price"], structured["volume"] = PRICES, VOLUMES
+    (series,), _ = codecs.decode_market_data(npy_bytes(structured), "application/x-npy")
+    assert series.symbol == "UNKNOWN" and series.price_data.dtype == np.float64
+    np.testing.assert_allclose(series.price_data, PRICES, rtol=1e-6)
+
+
+@pytest.mark.parametrize("body", [b"not npy", npy_bytes(np.ones((3, 4))),
+                                  npy_bytes(np.array([{"a": 1}], dtype=object))])
+def test_decode_npy_rejects_bad_bodies(body):
+    with pytest.raises(PayloadDecodeError):
+        codecs.decode_market_data(body, "application/x-npy")
+
+
+def test_decode_msgpack_bytes_and_lists():
+    payload = {"items": [
+        {"symbol": "A", "price_data": PRICES.astype("<f8").tobytes(), "volume_data": VOLUMES.tobytes()},
+        {"symbol": "B", "price_data": PRICES.tolist(), "volume_data": VOLUMES.tolist()},
+    ], "stream": True}
+
+    series, options = codecs.decode_market_data(msgpack.packb(payload, use_bin_type=True),
+                                                "application/msgpack")
+
+    assert [item.symbol for item in series] == ["A", "B"]
+    assert options == {"stream": True}
+    for item in series:
+        np.testing.assert_array_equal(item.price_data, PRICES)
+        np.testing.assert_array_equal(item.volume_data, VOLUMES)
+
+    single = msgpack.packb({"symbol": "C", "price_data": [1.0, 2.0], "volume_data": [3.0, 4.0]})
+    (series,), options = codecs.decode_market_data(single, "application/x-msgpack")
+    assert series.symbol == "C" and options == {}
+
+
+@pytest.mark.parametrize("payload", [
+    [1, 2, 3],
+    {"items": "AAPL"},
+    {"items": [1, 2]},
+    {"items": [{"symbol": "A", "price_data": b"\x00" * 12, "volume_data": b"\x00" * 16}]},
+    {"items": [{"symbol": "A", "price_data": [1.0, 2.0], "volume_data": [1.0]}]},
+])
+def test_decode_msgpack_rejects_malformed_payloads(payload):
+    with pytest.raises(PayloadDecodeError):
+        codecs.decode_market_data(msgpack.packb(payload, use_bin_type=True), "application/msgpack")
+
+
+@pytest.mark.parametrize("kind", [codecs.ARROW_STREAM, codecs.ARROW_FILE])
+def test_decode_arrow_long_format_keeps_first_appearance_order(kind):
+    symbols = ["MSFT", "AAPL", "MSFT", "SPY", "AAPL", "MSFT"]
+    table = pa.table({"symbol": symbols, "price": np.arange(6.0), "volume": np.arange(6.0) * 10})
+
+    series, _ = codecs.decode_market_data(arrow_bytes(table, kind), kind)
+
+    assert [item.symbol for item in series] == ["MSFT", "AAPL", "SPY"]
+    np.testing.assert_array_equal(series[0].price_data, [0.0, 2.0, 5.0])
+    np.testing.assert_array_equal(series[1].volume_data, [10.0, 40.0])
+    np.testing.assert_array_equal(series[2].price_data, [3.0])
+
+
+def test_decode_arrow_wide_table_uses_metadata_symbol():
+    table = pa.table({"price": PRICES, "volume": VOLUMES}).replace_schema_metadata({"symbol": "QQQ"})
+    (series,), _ = codecs.decode_market_data(arrow_bytes(table), codecs.ARROW_STREAM)
+    assert series.symbol == "QQQ"
+    np.testing.assert_array_equal(series.price_data, PRICES)
+
+
+def test_decode_arrow_rejects_null_symbols_and_missing_columns():
+    with_nulls = pa.table({"symbol": ["A", None], "price": [1.0, 2.0], "volume": [1.0, 2.0]})
+    with pytest.raises(PayloadDecodeError):
+        codecs.decode_market_data(arrow_bytes(with_nulls), codecs.ARROW_STREAM)
+    with pytest.raises(PayloadDecodeError):
+        codecs.decode_market_data(arrow_bytes(pa.table({"price": [1.0]})), codecs.ARROW_STREAM)
+
+
+def test_unsupported_content_type():
+    with pytest.raises(UnsupportedMediaTypeError):
+        codecs.decode_market_data(b"", "text/csv")
+
+
+@pytest.mark.parametrize("accept,expected", [
+    (None, codecs.JSON),
+    ("application/msgpack", codecs.MSGPACK),
+    ("text/html, application/vnd.apache.arrow.stream", codecs.ARROW_STREAM),
+    ("application/json;q=0.5, application/msgpack;q=0.9", codecs.MSGPACK),
+    ("application/msgpack;q=0, application/json;q=0.1", codecs.JSON),
+    ("application/msgpack;q=0.5, application/json;q=0.5", codecs.MSGPACK),
+    ("text/html, */*;q=0.1", codecs.JSON),
+])
+def test_negotiate_response_type(accept, expected):
+    assert codecs.negotiate_response_type(accept) == expected
+
+
+@pytest.mark.parametrize("accept", ["text/html", "application/msgpack;q=0"])
+def test_negotiate_response_type_rejects_unsupported(accept):
+    with pytest.raises(UnsupportedMediaTypeError):
+        codecs.negotiate_response_type(accept)
+
+
+PAYLOAD = {
+    "symbol": "SPY",
+    "timestamp": datetime(2026, 1, 2, 15, 30),
+    "confidence": np.float64(0.75),
+    "signals": [{"signal": "BUY", "strength": 0.9, "metadata": {"flow_type": "institutional"}},
+                {"signal": "SELL", "strength": 0.2, "metadata": {"flow_type": "retail"}}],
+}
+
+
+def test_encode_json_and_msgpack():
+    decoded = json.loads(codecs.encode_payload(PAYLOAD, codecs.JSON))
+    assert decoded["timestamp"] == "2026-01-02T15:30:00" and decoded["confidence"] == 0.75
+
+    decoded = msgpack.unpackb(codecs.encode_payload(PAYLOAD, codecs.MSGPACK), raw=False)
+    assert decoded["signals"][0]["metadata"] == {"flow_type": "institutional"}
+    assert decoded["timestamp"] == "2026-01-02T15:30:00"
+
+
+@pytest.mark.parametrize("kind", [codecs.ARROW_STREAM, codecs.ARROW_FILE])
+def test_encode_arrow_flattens_signals_and_keeps_fields_in_metadata(kind):
+    body = codecs.encode_payload(PAYLOAD, kind)
+    reader = pa.ipc.open_stream(body) if kind == codecs.ARROW_STREAM else pa.ipc.open_file(body)
+    table = reader.read_all()
+
+    assert table.column("signal").to_pylist() == ["BUY", "SELL"]
+    assert table.column("flow_type").to_pylist() == ["institutional", "retail"]
+    metadata = table.schema.metadata
+    assert json.loads(metadata[b"symbol"]) == "SPY"
+    assert json.loads(metadata[b"confidence"]) == 0.75
+    assert b"signals" not in metadata
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.linalg as la
+
+import analysis_jobs
+from qofa_core import QuantumOptionsFlowAnalyzer
+
+
+def options_chain(expiries=("2026-03-20", "2026-01-16", "2026-02-20"), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for k, expiration in enumerate(expiries):
+        for strike in range(80, 122 - 10 * k, 5):
+            rows.append({"expiration": expiration, "strike": float(strike),
+                         "volume": float(rng.integers(100, 5000)),
+                         "implied_volatility": 0.2 + abs(strike - 100) / 400})
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def analyzer(planck_constant=1.0):
+    analyzer = QuantumOptionsFlowAnalyzer()
+    analyzer.planck_constant = planck_constant
+    return analyzer
+
+
+def test_batch_matches_single_chain_builder_and_spectral_solver():
+    qofa = analyzer()
+    chain = options_chain()
+    batch = qofa.quantum_options_hamiltonian_batch(chain)
+    states, eigenvalues = qofa.solve_schrodinger_batch(batch, time_steps=20)
+
+    assert batch.expiries == sorted(chain["expiration"].unique())
+    for k, expiration in enumerate(batch.expiries):
+        size = batch.sizes[k]
+        rows = chain[chain["expiration"] == expiration].sort_values("strike")
+        single = qofa.quantum_options_hamiltonian(rows, representation="banded")
+        np.testing.assert_allclose(batch[k].diagonal, single.diagonal)
+        np.testing.assert_allclose(batch[k].off_diagonal, single.off_diagonal)
+        np.testing.assert_array_equal(batch.strikes[k, :size], rows["strike"].to_numpy())
+
+        initial = np.full(size, 1 / np.sqrt(size), dtype=complex)
+        state, energies = qofa.solve_schrodinger_equation(single, initial, time_steps=20,
+                                                          method="spectral", output="final")
+        np.testing.assert_allclose(states[k, :size], state, atol=1e-12)
+        np.testing.assert_allclose(eigenvalues[k, :size], energies, atol=1e-12)
+        assert not states[k, size:].any() and np.isnan(eigenvalues[k, size:]).all()
+
+
+def test_batch_evolves_the_hermitian_hamiltonian():
+    qofa = analyzer()
+    batch = qofa.quantum_options_hamiltonian_batch(options_chain())
+    time_steps = 30
+    states, _ = qofa.solve_schrodinger_batch(batch, time_steps=time_steps)
+
+    dense = batch.to_dense(hermitian=True)
+    t, dt = time_steps - 1, 1 / time_steps
+    for k, size in enumerate(batch.sizes):
+        hamiltonian = dense[k, :size, :size]
+        assert np.allclose(hamiltonian, hamiltonian.conj().T)
+        initial = np.full(size, 1 / np.sqrt(size))
+        expected = la.expm(-1j * hamiltonian * t * dt) @ initial * qofa._decoherence_factors(t, dt)
+        np.testing.assert_allclose(states[k, :size], expected, atol=1e-10)
+        # Unitary apart from decoherence
+        assert np.linalg.norm(states[k]) == pytest.approx(qofa._decoherence_factors(t, dt))
+
+
+def test_calls_and_puts_at_one_strike_are_merged():
+    calls = options_chain(expiries=("2026-01-16",))
+    puts = calls.assign(volume=calls["volume"] * 3, implied_volatility=calls["implied_volatility"] + 0.1)
+    chain = pd.concat([calls, puts], ignore_index=True)
+    batch = analyzer().quantum_options_hamiltonian_batch(chain)
+
+    merged = calls.sort_values("strike")
+    volume = merged["volume"].to_numpy() * 4
+    implied_vol = merged["implied_volatility"].to_numpy() + 0.075
+    assert batch.sizes.tolist() == [len(calls)]
+    np.testing.assert_allclose(batch.diagonal[0].real, implied_vol**2 + volume * 1e-6)
+    assert np.isfinite(batch.off_diagonal).all()
+
+
+def test_call_put_chain_analysis_is_finite_at_default_planck_constant():
+    chain = pd.concat([options_chain(), options_chain().assign(volume=1.0)], ignore_index=True)
+    results = analysis_jobs.analyze_options_chain(chain.to_dict("records"), time_steps=50)
+
+    assert [result["expiration"] for result in results] == ["2026-01-16", "2026-02-20", "2026-03-20"]
+    for result in results:
+        assert result["strikes"] == sorted(set(result["strikes"]))
+        assert np.isfinite(result["energy_levels"]).all()
+        assert np.isfinite(result["probabilities"]).all()
+        assert sum(result["probabilities"]) <= 1 + 1e-12
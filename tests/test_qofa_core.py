@@ -0,0 +1,265 @@
+import numpy as np
+import pytest
+import scipy.linalg as la
+import scipy.sparse as sp
+
+from qofa_core import BandedHamiltonian, QuantumOptionsFlowAnalyzer, RiskInputs
+
+
+def analyzer(planck_constant=1.0):
+    analyzer = QuantumOptionsFlowAnalyzer()
+    analyzer.planck_constant = planck_constant
+    return analyzer
+
+
+def market_series(n_symbols, n_points, seed=0):
+    """Prices as random walks; volumes high for the first basis states so √volume stays real"""
+    rng = np.random.default_rng(seed)
+    prices = 100 + np.cumsum(rng.normal(0, 1, (n_symbols, n_points)), axis=1)
+    volumes = np.where(np.arange(n_points) < 60, 2000.0, 100.0) + rng.uniform(0, 50, (n_symbols, n_points))
+    return prices, volumes
+
+
+def reference_field(qofa, prices, volumes):
+    """Ψ(t) = Σ_n c_n φ_n(t) exp(-iE_n t/ℏ), one basis state at a time"""
+    N = len(prices)
+    n_states = min(N, qofa.n_basis_states)
+    price = (prices - prices.mean()) / (prices.std() + 1e-10)
+    volume = (volumes - volumes.mean()) / (volumes.std() + 1e-10)
+    basis = qofa.basis_provider.generate(qofa.n_basis_states, N)
+    t = np.arange(N)
+    psi = np.zeros(N, dtype=complex)
+    for n in range(n_states):
+        energy = np.var(price[max(0, n - 10):n + 1])
+        coefficient = np.sqrt(volume[n]) * np.exp(1j * price[n])
+        psi += coefficient * basis[n] * np.exp(-1j * energy * t / qofa.planck_constant)
+    return psi
+
+
+def test_field_operator_batch_matches_reference_and_single_symbol():
+    qofa = analyzer()
+    prices, volumes = market_series(5, 80)
+
+    batch = qofa.quantum_field_operator_batch(prices, volumes)
+    # A tiny chunk budget forces one symbol per chunk
+    chunked = qofa.quantum_field_operator_batch(prices, volumes, max_chunk_bytes=1)
+
+    assert batch.shape == (5, 80) and np.all(np.isfinite(batch))
+    np.testing.assert_allclose(chunked, batch, rtol=1e-12, atol=1e-12)
+    for s in range(5):
+        np.testing.assert_allclose(qofa.quantum_field_operator(prices[s], volumes[s]), batch[s],
+                                   rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(batch[s], reference_field(qofa, prices[s], volumes[s]),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_field_operator_batch_shape_checks():
+    qofa = analyzer()
+    with pytest.raises(ValueError):
+        qofa.quantum_field_operator_batch(np.ones((2, 10)), np.ones((2, 11)))
+    assert qofa.quantum_field_operator_batch(np.empty((0, 10)), np.empty((0, 10))).shape == (0, 10)
+
+
+def reference_composite_state(series):
+    """C_ij = corrcoef(x_i, x_j) · exp(i arg(Σ x_i x_j*)), one pair at a time"""
+    n = len(series)
+    composite_state = np.zeros((n, n), dtype=complex)
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                correlation = np.corrcoef(series[i], series[j])[0, 1]
+                composite_state[i, j] = correlation * np.exp(1j * np.angle(np.sum(series[i] * np.conj(series[j]))))
+    return composite_state
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 3])
+def test_entanglement_detection_matches_pairwise_reference(block_size):
+    rng = np.random.default_rng(7)
+    market_data = {f"S{i}": rng.normal(size=64) for i in range(7)}
+    qofa = analyzer()
+
+    entropy = qofa.entanglement_detection(market_data, block_size=block_size)
+
+    expected = reference_composite_state(np.vstack(list(market_data.values())))
+    np.testing.assert_allclose(qofa.entanglement_matrix, expected, atol=1e-12)
+    s = np.linalg.svd(expected, compute_uv=False)
+    s = s / s.sum()
+    assert entropy == pytest.approx(-np.sum(s * np.log(s + 1e-10)), rel=1e-12)
+
+
+def random_banded(n, seed=2, complex_off_diagonal=False):
+    rng = np.random.default_rng(seed)
+    off_diagonal = rng.uniform(-1, 1, n - 1) + 0j
+    if complex_off_diagonal:
+        off_diagonal *= np.exp(1j * rng.uniform(0, np.pi, n - 1))
+    return BandedHamiltonian(diagonal=rng.uniform(0, 2, n) + 0j, off_diagonal=off_diagonal)
+
+
+def test_banded_and_sparse_expm_match_dense_expm():
+    qofa = analyzer()
+    # Complex off-diagonals: expm_multiply must evolve the complex-symmetric matrix as built
+    banded = random_banded(40, complex_off_diagonal=True)
+    psi0 = np.random.default_rng(3).normal(size=40) + 0j
+
+    dense_states, _ = qofa.solve_schrodinger_equation(banded.to_dense(), psi0, 25, 'expm')
+    for hamiltonian in (banded, banded.to_sparse()):
+        states, _ = qofa.solve_schrodinger_equation(hamiltonian, psi0, 25, 'expm')
+        np.testing.assert_allclose(states, dense_states, atol=1e-8)
+        final, _ = qofa.solve_schrodinger_equation(hamiltonian, psi0, 25, 'expm', output='final')
+        np.testing.assert_allclose(final, dense_states[-1], atol=1e-8)
+
+
+def test_banded_and_sparse_expm_at_default_planck_constant():
+    qofa = QuantumOptionsFlowAnalyzer()
+    banded = random_banded(30)
+    psi0 = np.ones(30, dtype=complex) / np.sqrt(30)
+
+    spectral_states, spectral_energies = qofa.solve_schrodinger_equation(banded, psi0, 20, 'spectral')
+    for hamiltonian in (banded, banded.to_sparse()):
+        states, energies = qofa.solve_schrodinger_equation(hamiltonian, psi0, 20, 'expm')
+        assert np.all(np.isfinite(states))
+        np.testing.assert_allclose(states, spectral_states)
+        np.testing.assert_allclose(energies, la.eigvalsh(banded.to_dense()), atol=1e-12)
+        np.testing.assert_allclose(spectral_energies, energies, atol=1e-12)
+
+
+def random_hermitian(n, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=(n, n)) + 1j * rng.normal(size=(n, n))
+    return (a + a.conj().T) / 2
+
+
+@pytest.mark.parametrize("output", ["all", "final", "stream"])
+def test_spectral_matches_expm_for_dense_hamiltonian(output):
+    qofa = analyzer()
+    hamiltonian = random_hermitian(12)
+    psi0 = np.random.default_rng(1).normal(size=12) + 0j
+
+    expm_states, expm_energies = qofa.solve_schrodinger_equation(hamiltonian, psi0, 30, 'expm', output)
+    spectral_states, spectral_energies = qofa.solve_schrodinger_equation(hamiltonian, psi0, 30,
+                                                                         'spectral', output)
+    if output == 'stream':
+        expm_states, spectral_states = np.array(list(expm_states)), np.array(list(spectral_states))
+
+    np.testing.assert_allclose(spectral_energies, expm_energies, atol=1e-10)
+    np.testing.assert_allclose(spectral_states, expm_states, atol=1e-9)
+
+
+def test_spectral_matches_expm_for_banded_and_sparse_hamiltonians():
+    qofa = analyzer()
+    banded = random_banded(40)
+    psi0 = np.random.default_rng(3).normal(size=40) + 0j
+
+    dense_states, _ = qofa.solve_schrodinger_equation(banded.to_dense(), psi0, 25, 'expm')
+    for hamiltonian in (banded, banded.to_sparse()):
+        states, energies = qofa.solve_schrodinger_equation(hamiltonian, psi0, 25, 'spectral')
+        np.testing.assert_allclose(states, dense_states, atol=1e-8)
+        np.testing.assert_allclose(energies, la.eigvalsh(banded.to_dense()), atol=1e-10)
+
+
+def test_spectral_applies_closed_form_decoherence():
+    qofa = analyzer()
+    qofa.decoherence_time = 0.5
+    hamiltonian = random_hermitian(6, seed=3)
+    psi0 = np.ones(6, dtype=complex)
+
+    expm_states, _ = qofa.solve_schrodinger_equation(hamiltonian, psi0, 10, 'expm')
+    spectral_states, _ = qofa.solve_schrodinger_equation(hamiltonian, psi0, 10, 'spectral')
+    np.testing.assert_allclose(spectral_states, expm_states, atol=1e-10)
+    np.testing.assert_allclose(qofa._decoherence_factors(np.arange(3), 0.1), np.exp([0, 0, -0.2]))
+
+
+def test_unknown_method_and_output_are_rejected():
+    qofa = analyzer()
+    with pytest.raises(ValueError):
+        qofa.solve_schrodinger_equation(np.eye(2), np.ones(2), 5, method='euler')
+    with pytest.raises(ValueError):
+        qofa.solve_schrodinger_equation(np.eye(2), np.ones(2), 5, output='last')
+
+
+def test_risk_inputs_from_market_conditions():
+    portfolio = {"AAPL": 0.5, "MSFT": 0.3, "GOOG": 0.2}
+    conditions = {"AAPL_volatility": 0.3, "MSFT_volatility": 0.25,
+                  "AAPL_MSFT_correlation": 0.6, "GOOG_AAPL_correlation": 0.2,
+                  "AAPL_AAPL_correlation": 0.9, "UNKNOWN_MSFT_correlation": 0.5}
+
+    inputs = RiskInputs.from_market_conditions(portfolio, conditions)
+
+    assert inputs.symbols == ["AAPL", "MSFT", "GOOG"]
+    np.testing.assert_allclose(inputs.weights, [0.5, 0.3, 0.2])
+    np.testing.assert_allclose(inputs.volatilities, [0.3, 0.25, RiskInputs.DEFAULT_VOLATILITY])
+    assert sp.issparse(inputs.correlation)
+    expected = np.zeros((3, 3))
+    expected[0, 1], expected[2, 0] = 0.6, 0.2
+    np.testing.assert_allclose(inputs.correlation.toarray(), expected)
+
+
+def test_risk_inputs_with_underscore_symbols():
+    portfolio = {"BRK_B": 0.5, "B": 0.5}
+    conditions = {"BRK_B_B_correlation": 0.4, "BRK_B_volatility": 0.1}
+
+    inputs = RiskInputs.from_market_conditions(portfolio, conditions)
+
+    np.testing.assert_allclose(inputs.correlation.toarray(), [[0, 0.4], [0, 0]])
+    np.testing.assert_allclose(inputs.volatilities, [0.1, 0.2])
+
+
+def test_risk_assessment_dict_and_array_forms_agree():
+    rng = np.random.default_rng(6)
+    symbols = [f"S{i}" for i in range(8)]
+    weights = rng.uniform(0.1, 1, 8)
+    volatilities = rng.uniform(0.1, 0.5, 8)
+    correlation = np.triu(rng.uniform(-0.5, 0.5, (8, 8)), 1)
+
+    conditions = {f"{s}_volatility": v for s, v in zip(symbols, volatilities)}
+    conditions.update({f"{symbols[i]}_{symbols[j]}_correlation": correlation[i, j]
+                       for i in range(8) for j in range(i + 1, 8)})
+    qofa = analyzer()
+
+    from_dict = qofa.quantum_risk_assessment(dict(zip(symbols, weights)), conditions)
+    dense = qofa.quantum_risk_assessment_arrays(RiskInputs(weights, volatilities, correlation))
+    sparse = qofa.quantum_risk_assessment_arrays(RiskInputs(weights, volatilities, sp.csr_matrix(correlation)))
+
+    state = weights / np.linalg.norm(weights)
+    hamiltonian = 0.1 * correlation + np.diag(volatilities**2)
+    for metrics in (from_dict, dense, sparse):
+        assert metrics["quantum_risk"] == pytest.approx(state @ hamiltonian @ state, rel=1e-12)
+        assert metrics["diversification_ratio"] == pytest.approx(from_dict["diversification_ratio"])
+        assert metrics["entanglement_risk"] == 0.0
+
+    with pytest.raises(ValueError):
+        qofa.quantum_risk_assessment_arrays(RiskInputs(weights, volatilities, np.zeros((3, 3))))
+
+
+def windowed_entropies(market_data, window, step):
+    n_points = len(next(iter(market_data.values())))
+    entropies = []
+    for start in range(0, n_points - window + 1, step):
+        entropies.append(QuantumOptionsFlowAnalyzer().entanglement_detection(
+            {symbol: series[start:start + window] for symbol, series in market_data.items()}))
+    return np.array(entropies)
+
+
+@pytest.mark.parametrize("window,step", [(30, 1), (30, 7), (10, 15)])
+def test_rolling_entropy_matches_per_window_detection(window, step):
+    rng = np.random.default_rng(4)
+    market_data = {f"S{i}": 100 + np.cumsum(rng.normal(size=120)) for i in range(6)}
+    qofa = analyzer()
+
+    rolling = qofa.rolling_entanglement_entropy(market_data, window, step=step)
+
+    np.testing.assert_allclose(rolling, windowed_entropies(market_data, window, step), rtol=1e-8, atol=1e-10)
+    assert qofa.entanglement_matrix is None
+
+
+def test_rolling_entropy_flat_window_is_nan():
+    rng = np.random.default_rng(5)
+    flat = np.concatenate([np.full(20, 50.0), 50 + np.cumsum(rng.normal(size=40))])
+    market_data = {"A": flat, "B": 100 + np.cumsum(rng.normal(size=60))}
+
+    rolling = QuantumOptionsFlowAnalyzer().rolling_entanglement_entropy(market_data, window=20, step=10)
+
+    assert np.isnan(rolling[0])
+    assert np.all(np.isfinite(rolling[1:]))
+    with pytest.raises(ValueError):
+        QuantumOptionsFlowAnalyzer().rolling_entanglement_entropy(market_data, window=61)
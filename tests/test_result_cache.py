@@ -0,0 +1,115 @@
+import asyncio
+
+import numpy as np
+from mongomock_motor import AsyncMongoMockClient
+
+from result_cache import MemoryResultTier, MongoResultTier, ResultCache, result_key
+
+
+PARAMS = {"n_basis_states": 10, "planck_constant": 1.0, "decoherence_time": 1.0}
+
+
+def test_result_key_tracks_content_and_params():
+    prices, volumes = np.arange(5.0), np.ones(5)
+    key = result_key("SPY", prices, volumes, PARAMS)
+    assert key == result_key("SPY", prices.copy(), volumes.copy(), dict(PARAMS))
+    assert key != result_key("QQQ", prices, volumes, PARAMS)
+    assert key != result_key("SPY", prices + 1e-12, volumes, PARAMS)
+    assert key != result_key("SPY", prices, volumes, {**PARAMS, "planck_constant": 2.0})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryResultTier(max_bytes=10)
+    tier.put("a", b"1234")
+    tier.put("b", b"1234")
+    tier.get("a")
+    tier.put("c", b"1234")
+    assert tier.get("b") is None
+    assert tier.get("a") == b"1234" and tier.get("c") == b"1234"
+    assert tier.stats()["evictions"] == 1
+
+
+def test_get_many_reads_mongo_tier_in_one_pass_and_promotes_hits():
+    async def run():
+        collection = AsyncMongoMockClient()["qofa_test"]["analysis_results"]
+        shared = ResultCache(MemoryResultTier(), MongoResultTier(collection, ttl_seconds=60))
+        await shared.ensure_indexes()
+        await shared.put("a", {"value": 1})
+        await shared.put("b", {"value": 2})
+
+        cache = ResultCache(MemoryResultTier(), MongoResultTier(collection, ttl_seconds=60))
+        results = await cache.get_many(["b", "x", "a", "b"])
+        promoted = cache.memory.get("a") is not None and cache.memory.get("b") is not None
+        return results, cache.stats(), promoted
+
+    results, stats, promoted = asyncio.run(run())
+    assert results == [{"value": 2}, None, {"value": 1}, {"value": 2}]
+    assert promoted
+    assert stats["hits"] == 3 and stats["misses"] == 1 and stats["mongo_hits"] == 2
+
+
+def test_mongo_failures_are_misses():
+    class BrokenTier(MongoResultTier):
+        async def get_many(self, keys):
+            raise ConnectionError("mongo unavailable")
+
+        async def put(self, key, body):
+            raise ConnectionError("mongo unavailable")
+
+    async def run():
+        cache = ResultCache(MemoryResultTier(), BrokenTier(None, ttl_seconds=60))
+        missed = await cache.get("a")
+        await cache.put("a", {"value": 1})
+        return missed, await cache.get("a")
+
+    assert asyncio.run(run()) == (None, {"value": 1})
+
+
+class RecordingDatabase:
+    """Stands in for the database's command(), which mongomock lacks for collMod"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.commands = []
+
+    async def command(self, document):
+        self.commands.append(document)
+        # Apply the TTL change the way the server would
+        await self.collection.drop_index("created_at_1")
+        await self.collection.create_index("created_at", expireAfterSeconds=document["index"]["expireAfterSeconds"])
+
+
+class IndexedCollection:
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+        self.database = RecordingDatabase(collection)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+def test_ensure_indexes_retunes_existing_ttl():
+    async def run():
+        collection = IndexedCollection(AsyncMongoMockClient()["qofa_test"]["ttl_results"])
+        await MongoResultTier(collection, ttl_seconds=60).ensure_indexes()
+        await MongoResultTier(collection, ttl_seconds=60).ensure_indexes()
+        assert collection.database.commands == []
+
+        await MongoResultTier(collection, ttl_seconds=120).ensure_indexes()
+        return collection.database.commands, await collection.index_information()
+
+    commands, indexes = asyncio.run(run())
+    assert commands == [{"collMod": "ttl_results",
+                         "index": {"keyPattern": {"created_at": 1}, "expireAfterSeconds": 120}}]
+    assert indexes["created_at_1"]["expireAfterSeconds"] == 120
+
+
+def test_ensure_indexes_replaces_plain_created_at_index():
+    async def run():
+        collection = AsyncMongoMockClient()["qofa_test"]["plain_results"]
+        await collection.create_index("created_at")
+        await MongoResultTier(collection, ttl_seconds=30).ensure_indexes()
+        return await collection.index_information()
+
+    assert asyncio.run(run())["created_at_1"]["expireAfterSeconds"] == 30
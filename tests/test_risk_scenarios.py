@@ -0,0 +1,112 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from scipy.stats import norm
+
+import risk_scenarios
+
+
+WEIGHTS = np.array([0.5, 0.3, 0.2])
+VOLATILITIES = np.array([0.3, 0.2, 0.4])
+CORRELATION = np.array([[1.0, 0.5, 0.2],
+                        [0.5, 1.0, -0.1],
+                        [0.2, -0.1, 1.0]])
+
+
+def run(**options):
+    return risk_scenarios.run_scenarios(WEIGHTS, VOLATILITIES, CORRELATION, **options)
+
+
+def test_results_depend_only_on_seed_and_chunk_layout():
+    first = run(n_paths=20_000, seed=7, chunk_size=3000)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        second = run(n_paths=20_000, seed=7, chunk_size=3000, map_fn=pool.map)
+
+    assert first["chunks"] == 7
+    assert first["var"] == second["var"] and first["cvar"] == second["cvar"]
+    assert first["distribution"] == second["distribution"]
+    for level in first["component_cvar"]:
+        np.testing.assert_allclose(first["component_cvar"][level], second["component_cvar"][level])
+    assert run(n_paths=20_000, seed=8, chunk_size=3000)["var"] != first["var"]
+
+
+def test_var_and_cvar_match_normal_quantiles():
+    metrics = run(n_paths=200_000, seed=1, horizon_days=10)
+    sigma = math.sqrt(WEIGHTS @ (np.outer(VOLATILITIES, VOLATILITIES) * CORRELATION) @ WEIGHTS * 10 / 252)
+
+    assert metrics["parametric_std"] == pytest.approx(sigma, rel=1e-12)
+    assert metrics["std_pnl"] == pytest.approx(sigma, rel=0.01)
+    assert abs(metrics["mean_pnl"]) < 0.01 * sigma
+    for level in (0.95, 0.99):
+        z = norm.ppf(level)
+        assert metrics["var"][level] == pytest.approx(z * sigma, rel=0.03)
+        assert metrics["cvar"][level] == pytest.approx(norm.pdf(z) / (1 - level) * sigma, rel=0.03)
+
+    distribution = metrics["distribution"]
+    assert sum(distribution["counts"]) + distribution["below"] + distribution["above"] == 200_000
+
+
+def test_component_cvar_sums_to_cvar():
+    metrics = run(n_paths=50_000, seed=2, chunk_size=4096)
+    for level, components in metrics["component_cvar"].items():
+        assert components.shape == (3,)
+        assert components.sum() == pytest.approx(metrics["cvar"][level], rel=1e-6)
+
+
+def test_max_chunk_bytes_bounds_chunk_size():
+    plan = risk_scenarios.plan_scenarios(WEIGHTS, VOLATILITIES, CORRELATION, n_paths=1000,
+                                         max_chunk_bytes=8 * 3 * 100)
+    assert plan.chunk_size == 100 and len(plan.chunks) == 10
+    assert sum(n for n, _ in plan.chunks) == 1000
+
+
+def test_plan_rejects_bad_inputs():
+    with pytest.raises(ValueError):
+        risk_scenarios.plan_scenarios(WEIGHTS, VOLATILITIES[:2], CORRELATION)
+    with pytest.raises(ValueError):
+        risk_scenarios.plan_scenarios(WEIGHTS, VOLATILITIES, CORRELATION, n_paths=0)
+    with pytest.raises(ValueError):
+        risk_scenarios.plan_scenarios(WEIGHTS, VOLATILITIES, CORRELATION, confidence_levels=(1.0,))
+
+
+def test_correlation_factor_repairs_indefinite_matrix():
+    inconsistent = np.array([[1.0, 0.9, -0.9],
+                             [0.9, 1.0, 0.9],
+                             [-0.9, 0.9, 1.0]])
+    factor = risk_scenarios.correlation_factor(inconsistent)
+    repaired = factor @ factor.T
+    np.testing.assert_allclose(np.diag(repaired), 1.0, atol=1e-9)
+    assert np.all(np.linalg.eigvalsh(repaired) > 0)
+
+
+def test_symmetric_correlation_prefers_upper_triangle():
+    entries = sp.coo_matrix(([0.4, 0.1, 0.3, 0.9], ([0, 1, 2, 1], [1, 0, 0, 1])), shape=(3, 3))
+    result = risk_scenarios.symmetric_correlation(entries, 3)
+    np.testing.assert_allclose(result, [[1.0, 0.4, 0.3],
+                                        [0.4, 1.0, 0.0],
+                                        [0.3, 0.0, 1.0]])
+    np.testing.assert_array_equal(risk_scenarios.symmetric_correlation(None, 2), np.eye(2))
+
+
+def test_symmetric_correlation_sums_duplicates_like_csr():
+    entries = sp.coo_matrix(([0.2, 0.3, 0.1], ([0, 0, 2], [1, 1, 1])), shape=(3, 3))
+    result = risk_scenarios.symmetric_correlation(entries, 3)
+    csr = sp.csr_matrix(entries).toarray()
+    assert result[0, 1] == result[1, 0] == pytest.approx(csr[0, 1]) == pytest.approx(0.5)
+    assert result[2, 1] == result[1, 2] == pytest.approx(csr[2, 1])
+
+
+def test_risk_arrays_adapts_market_conditions():
+    symbols, weights, volatilities, correlation = risk_scenarios.risk_arrays(
+        {"AAPL": 2.0, "MSFT": 1.0, "BRK_B": 1.0},
+        {"AAPL_volatility": 0.3, "MSFT_AAPL_correlation": 0.5, "BRK_B_MSFT_correlation": -0.2}
+    )
+    assert symbols == ["AAPL", "MSFT", "BRK_B"]
+    np.testing.assert_allclose(weights, [2.0, 1.0, 1.0])
+    np.testing.assert_allclose(volatilities, [0.3, 0.2, 0.2])
+    np.testing.assert_allclose(correlation, [[1.0, 0.5, 0.0],
+                                             [0.5, 1.0, -0.2],
+                                             [0.0, -0.2, 1.0]])
@@ -0,0 +1,174 @@
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def pdf(client):
+    """The white paper PDF, waiting out the background build"""
+    for _ in range(300):
+        response = client.get("/api/whitepaper/pdf")
+        if response.status_code != 503:
+            break
+        time.sleep(0.2)
+    assert response.status_code == 200
+    return response
+
+
+def test_options_chain_with_calls_and_puts(client):
+    rows = [{"strike": strike, "volume": 1000 + strike, "implied_volatility": 0.25, "expiration": "2026-01-16",
+             "type": kind} for strike in (90.0, 95.0, 100.0, 105.0) for kind in ("call", "put")]
+    response = client.post("/api/analyze/options-chain", json={"symbol": "SPY", "options_data": rows})
+    assert response.status_code == 200
+    (expiry,) = response.json()["expiries"]
+    assert expiry["strikes"] == [90.0, 95.0, 100.0, 105.0]
+    assert len(expiry["energy_levels"]) == len(expiry["probabilities"]) == 4
+
+
+def market_item(symbol, n_points=80, seed=0):
+    rng = np.random.default_rng(seed)
+    return {"symbol": symbol, "price_data": (100 + np.cumsum(rng.normal(size=n_points))).tolist(),
+            "volume_data": rng.uniform(1000, 5000, n_points).tolist()}
+
+
+def test_batch_matches_single_symbol_analysis(client):
+    items = [market_item(f"B{i}", n_points=60 + 10 * i, seed=i) for i in range(4)]
+    response = client.post("/api/analyze/quantum-flow/batch", json={"items": items})
+    assert response.status_code == 200
+    payload = response.json()
+    assert list(payload["results"]) == ["B0", "B1", "B2", "B3"] and payload["count"] == 4
+
+    for item in items:
+        single = client.post("/api/analyze/quantum-flow", json=item).json()
+        assert payload["results"][item["symbol"]]["confidence"] == pytest.approx(single["confidence"])
+        assert len(payload["results"][item["symbol"]]["signals"]) == len(single["signals"])
+
+
+def test_batch_streams_ndjson(client):
+    items = [market_item(f"N{i}", seed=10 + i) for i in range(3)]
+    response = client.post("/api/analyze/quantum-flow/batch?stream=true", json={"items": items})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["symbol"] for line in lines) == ["N0", "N1", "N2"]
+
+
+def test_batch_rejects_duplicate_symbols(client):
+    items = [market_item("DUP"), market_item("X"), market_item("DUP", seed=1)]
+    response = client.post("/api/analyze/quantum-flow/batch", json={"items": items})
+    assert response.status_code == 400
+    assert "DUP" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path", ["/api/whitepaper", "/api/whitepaper/markdown"])
+def test_whitepaper_revalidates_with_etag(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    revalidated = client.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_whitepaper_compressed_variants(client):
+    plain = client.get("/api/whitepaper", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/whitepaper", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    # Any encoding variant's tag revalidates
+    assert client.get("/api/whitepaper", headers={"If-None-Match": compressed.headers["etag"],
+                                                   "Accept-Encoding": "identity"}).status_code == 304
+
+
+def test_whitepaper_sections(client):
+    toc = client.get("/api/whitepaper/sections")
+    assert toc.status_code == 200
+    names = [section["name"] for section in toc.json()["sections"]]
+    assert names[0] == "abstract" and "references" in names
+    assert client.get("/api/whitepaper/sections", headers={"If-None-Match": toc.headers["etag"]}).status_code == 304
+
+    section = client.get("/api/whitepaper/sections/abstract")
+    assert section.json()["title"] == "Abstract"
+    markdown = client.get("/api/whitepaper/sections/abstract?format=markdown")
+    assert markdown.headers["content-type"].startswith("text/markdown")
+    assert markdown.text.startswith("## Abstract")
+
+
+def test_whitepaper_section_errors(client):
+    assert client.get("/api/whitepaper/sections/appendix").status_code == 404
+    assert client.get("/api/whitepaper/sections/abstract?format=html").status_code == 400
+
+
+def test_whitepaper_markdown_stream_matches_export(client):
+    streamed = client.get("/api/whitepaper/markdown/stream")
+    assert streamed.text == client.get("/api/whitepaper/markdown").json()["content"]
+
+
+def test_pdf_revalidation(client, pdf):
+    assert pdf.content.startswith(b"%PDF")
+    assert pdf.headers["accept-ranges"] == "bytes"
+    etag = pdf.headers["etag"]
+
+    for if_none_match in (etag, f'"other", W/{etag}', "*"):
+        response = client.get("/api/whitepaper/pdf", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+    assert client.get("/api/whitepaper/pdf", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_pdf_byte_ranges(client, pdf):
+    size = len(pdf.content)
+
+    response = client.get("/api/whitepaper/pdf", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == pdf.content[:10]
+    assert response.headers["content-range"] == f"bytes 0-9/{size}"
+
+    response = client.get("/api/whitepaper/pdf", headers={"Range": "bytes=-16"})
+    assert response.status_code == 206 and response.content == pdf.content[-16:]
+
+    response = client.get("/api/whitepaper/pdf", headers={"Range": f"bytes={size - 4}-{size + 100}"})
+    assert response.status_code == 206 and response.content == pdf.content[-4:]
+
+    response = client.get("/api/whitepaper/pdf", headers={"Range": f"bytes={size}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+@pytest.mark.parametrize("headers", [{"Range": "bytes=5-3"}, {"Range": "bytes=-"}, {"Range": "bytes=0-1,4-5"},
+                                     {"Range": "bytes=0-9", "If-Range": '"stale"'}])
+def test_pdf_ignored_ranges_return_whole_file(client, pdf, headers):
+    response = client.get("/api/whitepaper/pdf", headers=headers)
+    assert response.status_code == 200
+    assert response.content == pdf.content
+
+
+def test_risk_arrays_sparse_entries_match_dense(client):
+    body = {"weights": [0.5, 0.3, 0.2], "volatilities": [0.3, 0.2, 0.4]}
+    dense = client.post("/api/analyze/risk-assessment/arrays",
+                        json={**body, "correlation": [[1, 0.5, 0], [0, 1, -0.2], [0, 0, 1]]})
+    sparse = client.post("/api/analyze/risk-assessment/arrays",
+                         json={**body, "correlation_entries": [[0, 1, 0.5], [1, 2, -0.2]]})
+    assert dense.status_code == sparse.status_code == 200
+    assert sparse.json()["risk_metrics"]["quantum_risk"] == pytest.approx(dense.json()["risk_metrics"]["quantum_risk"])
+
+
+def test_risk_arrays_rejects_duplicate_entries(client):
+    response = client.post("/api/analyze/risk-assessment/arrays", json={
+        "weights": [0.5, 0.5], "volatilities": [0.2, 0.3],
+        "correlation_entries": [[0, 1, 0.2], [1, 0, 0.1], [0, 1, 0.3]]
+    })
+    assert response.status_code == 400
+    assert "(0, 1)" in response.json()["detail"]
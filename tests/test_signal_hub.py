@@ -0,0 +1,47 @@
+import asyncio
+
+from signal_hub import SignalHub, Subscription
+from streaming_flow import StreamingFlowAnalyzer
+
+
+def drain(subscription):
+    return asyncio.run(subscription.get())
+
+
+def test_backlog_coalesces_signals_per_symbol():
+    subscription = Subscription(max_queue=2)
+    for i in range(5):
+        subscription.push({"type": "signal", "symbol": "SPY", "i": i})
+    subscription.push({"type": "signal", "symbol": "QQQ", "i": 0})
+    assert subscription.pending == 4
+    assert [message["i"] for message in drain(subscription)] == [0, 1, 4, 0]
+
+
+def test_control_messages_respect_max_queue():
+    subscription = Subscription(max_queue=3)
+    for i in range(100):
+        subscription.push({"type": "ack", "symbol": "SPY", "ticks": i}, control=True)
+        subscription.push({"type": "error", "detail": str(i)}, control=True)
+    assert subscription.pending == 5
+    messages = drain(subscription)
+    assert messages[-2:] == [{"type": "ack", "symbol": "SPY", "ticks": 99}, {"type": "error", "detail": "99"}]
+
+
+def test_detectors_are_bounded_least_recently_used():
+    streams = StreamingFlowAnalyzer(window=5, max_symbols=2)
+    streams.update("A", 1.0, 1.0)
+    streams.update("B", 1.0, 1.0)
+    streams.update("A", 2.0, 1.0)
+    streams.update("C", 1.0, 1.0)
+    assert list(streams.detectors) == ["A", "C"]
+    assert streams.evictions == 1
+
+
+def test_detect_then_broadcast_reaches_subscribers():
+    hub = SignalHub(StreamingFlowAnalyzer(window=5))
+    subscription = hub.open(["SPY"])
+    signals = asyncio.run(asyncio.to_thread(hub.detect_signals, "SPY", [1.0, 2.0, 3.0], [1.0, 1.0, 1.0]))
+    delivered = hub.broadcast_signals("SPY", signals + [{"action": "BUY"}])
+    assert delivered == len(signals) + 1
+    assert drain(subscription)[-1] == {"type": "signal", "action": "BUY"}
+    assert hub.stats()["ticks"] == 3
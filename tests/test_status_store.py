@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+
+from status_store import StatusStore, StatusWriteBuffer, decode_cursor, encode_cursor
+
+
+def make_collection():
+    return AsyncMongoMockClient()["qofa_test"]["status_checks"]
+
+
+def status_documents(count, start=datetime(2026, 1, 1)):
+    return [{"id": f"{i:04d}", "client_name": f"client-{i}", "timestamp": start + timedelta(seconds=i // 2)}
+            for i in range(count)]
+
+
+class FailingCollection:
+    """Fails the listed batch positions once with the given write error code"""
+
+    def __init__(self, collection, failing, code):
+        self.collection = collection
+        self.failing = set(failing)
+        self.code = code
+
+    async def insert_many(self, documents, ordered=True):
+        errors = [{"index": i, "code": self.code, "errmsg": "write failed", "op": document}
+                  for i, document in enumerate(documents) if i in self.failing]
+        self.failing.clear()
+        written = [document for i, document in enumerate(documents) if i not in {e["index"] for e in errors}]
+        if written:
+            await self.collection.insert_many(written, ordered=ordered)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(written)})
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 3, 4, 5, 6, 7, 123456)
+    assert decode_cursor(encode_cursor(timestamp, "abc|def")) == (timestamp, "abc|def")
+
+
+def test_buffer_coalesces_inserts():
+    async def run():
+        collection = make_collection()
+        buffer = StatusWriteBuffer(collection, max_batch=4)
+        for document in status_documents(10):
+            buffer.add(document)
+        assert buffer.pending == 10
+        await buffer.flush()
+        return buffer.stats(), await collection.count_documents({})
+
+    stats, stored = asyncio.run(run())
+    assert stored == 10
+    assert stats == {"pending": 0, "flushed": 10, "batches": 3, "dropped": 0}
+
+
+def test_background_flush_on_full_batch():
+    async def run():
+        collection = make_collection()
+        buffer = StatusWriteBuffer(collection, max_batch=5, flush_interval=60)
+        buffer.start()
+        for document in status_documents(5):
+            buffer.add(document)
+        for _ in range(100):
+            if buffer.flushed == 5:
+                break
+            await asyncio.sleep(0.01)
+        flushed = buffer.flushed
+        await buffer.stop()
+        return flushed
+
+    assert asyncio.run(run()) == 5
+
+
+def test_partial_insert_requeues_only_failed_documents():
+    async def run():
+        collection = make_collection()
+        buffer = StatusWriteBuffer(FailingCollection(collection, failing=[1, 3], code=121))
+        for document in status_documents(5):
+            buffer.add(document)
+        await buffer.flush()
+        first = (buffer.flushed, [document["id"] for document in buffer._pending])
+        await buffer.flush()
+        return first, buffer.stats(), await collection.count_documents({})
+
+    first, stats, stored = asyncio.run(run())
+    assert first == (3, ["0001", "0003"])
+    assert stats["flushed"] == 5 and stats["pending"] == 0
+    assert stored == 5
+
+
+def test_duplicate_key_errors_are_not_retried():
+    async def run():
+        collection = make_collection()
+        documents = status_documents(4)
+        await collection.insert_many([documents[0], documents[2]])
+        buffer = StatusWriteBuffer(collection)
+        for document in documents:
+            buffer.add(document)
+        await buffer.flush()
+        return buffer.stats(), await collection.count_documents({})
+
+    stats, stored = asyncio.run(run())
+    assert stats["pending"] == 0 and stats["flushed"] == 2
+    assert stored == 4
+
+
+def test_page_walks_keyset_cursor_newest_first():
+    async def run():
+        store = StatusStore(make_collection())
+        await store.ensure_indexes()
+        for document in status_documents(11):
+            store.add(document)
+        pages, cursor = [], None
+        while True:
+            documents, cursor = await store.page(limit=4, cursor=cursor)
+            pages.append([document["id"] for document in documents])
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(run())
+    assert [len(page) for page in pages] == [4, 4, 3]
+    ids = [doc_id for page in pages for doc_id in page]
+    assert ids == [f"{i:04d}" for i in reversed(range(11))]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from qofa_core import QuantumOptionsFlowAnalyzer
+from streaming_flow import StreamingFlowAnalyzer, StreamingFlowDetector, WindowStats
+
+
+def tick_series(n_ticks, seed=7):
+    rng = np.random.default_rng(seed)
+    prices = 100 + rng.standard_normal(n_ticks).cumsum()
+    # A falling volume trend keeps the leading ticks of each window above the mean, so Ψ is finite
+    volumes = 6000 - 10 * np.arange(n_ticks) + rng.uniform(0, 50, n_ticks)
+    return prices, volumes
+
+
+def test_streaming_psi_matches_field_operator():
+    analyzer = QuantumOptionsFlowAnalyzer()
+    analyzer.planck_constant = 1.0
+    window = 120
+    prices, volumes = tick_series(260)
+    detector = StreamingFlowDetector(analyzer, "SPY", window=window)
+
+    compared = 0
+    for t in range(len(prices)):
+        detector.update(prices[t], volumes[t])
+        start = max(0, t + 1 - window)
+        expected = analyzer.quantum_field_operator(prices[start:t + 1], volumes[start:t + 1])[-1]
+        if np.isfinite(expected):
+            assert detector.psi == pytest.approx(expected, rel=1e-9, abs=1e-9)
+            compared += 1
+    assert compared > 100
+
+
+def test_streaming_psi_at_default_planck_constant():
+    analyzer = QuantumOptionsFlowAnalyzer()
+    prices, volumes = tick_series(260)
+    detector = StreamingFlowDetector(analyzer, "SPY", window=120)
+
+    for t in range(len(prices)):
+        detector.update(prices[t], volumes[t])
+        start = max(0, t + 1 - 120)
+        expected = analyzer.quantum_field_operator(prices[start:t + 1], volumes[start:t + 1])[-1]
+        # The phase is decided by rounding at this ℏ; finiteness still agrees with the batch operator
+        assert np.isfinite(detector.psi) == np.isfinite(expected)
+
+
+def test_window_stats_refresh_matches_running_updates():
+    values = np.random.default_rng(4).normal(1e6, 1.0, size=30)
+    running, refreshed = WindowStats(), WindowStats()
+    for value in values:
+        running.add(value)
+    refreshed.refresh(values)
+    assert refreshed.count == running.count == 30
+    assert refreshed.mean == pytest.approx(running.mean, rel=1e-15)
+    assert refreshed.variance == pytest.approx(values.var(), rel=1e-12)
+    assert running.variance == pytest.approx(values.var(), rel=1e-6)
+
+
+def test_window_stats_tracks_sliding_window():
+    values = np.random.default_rng(3).normal(size=50)
+    stats = WindowStats()
+    for i, value in enumerate(values):
+        if i >= 10:
+            stats.remove(values[i - 10])
+        stats.add(value)
+        window = values[max(0, i - 9):i + 1]
+        assert stats.mean == pytest.approx(window.mean())
+        assert stats.variance == pytest.approx(window.var(), abs=1e-12)
+
+
+def test_analyzer_keeps_one_detector_per_symbol():
+    streams = StreamingFlowAnalyzer(window=20)
+    streams.update("SPY", 100.0, 1000.0)
+    streams.update("QQQ", 200.0, 1000.0)
+    streams.update("SPY", 101.0, 1000.0)
+    assert streams.detectors["SPY"].ticks == 2
+    streams.reset("SPY")
+    assert set(streams.detectors) == {"QQQ"}
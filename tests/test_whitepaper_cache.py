@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from whitepaper_cache import WhitePaperContentCache
+from whitepaper_generator import QOFAWhitePaper
+
+
+class CountingWhitePaper(QOFAWhitePaper):
+    """Records which generator methods run"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        for _, _, method in self.SECTIONS:
+            original = getattr(self, method)
+            setattr(self, method, self._counted(method, original))
+
+    def _counted(self, name, method):
+        def counted():
+            self.calls.append(name)
+            return method()
+        return counted
+
+    def generate_complete_whitepaper(self):
+        self.calls.append("generate_complete_whitepaper")
+        return super().generate_complete_whitepaper()
+
+
+def test_section_is_generated_on_its_own():
+    generator = CountingWhitePaper()
+    cache = WhitePaperContentCache(generator)
+
+    section = cache.get("section:conclusion")
+    cache.get("section_markdown:conclusion")
+    cache.get("section:conclusion")
+
+    assert generator.calls == ["generate_conclusion"]
+    assert json.loads(section.body) == {"name": "conclusion", "title": "Conclusion",
+                                        "content": generator.generate_conclusion()}
+
+
+def test_lazy_sections_match_full_render():
+    lazy = WhitePaperContentCache(QOFAWhitePaper())
+    bodies = {name: lazy.get(f"section_markdown:{name}") for name, _, _ in QOFAWhitePaper.SECTIONS}
+    full = WhitePaperContentCache(QOFAWhitePaper())
+    full.warm()
+
+    for name, _, _ in QOFAWhitePaper.SECTIONS:
+        assert full.get(f"section:{name}").etag == lazy.get(f"section:{name}").etag
+        assert full.get(f"section_markdown:{name}").body == bodies[name].body
+    # Rendering the whole document afterwards reuses the sections already built
+    assert lazy.get("toc").body == full.get("toc").body
+    assert b"".join(full.markdown_chunks()).decode() == QOFAWhitePaper().export_to_markdown()
+
+
+def test_unknown_section_raises_key_error():
+    cache = WhitePaperContentCache(QOFAWhitePaper())
+    with pytest.raises(KeyError):
+        cache.get("section:appendix")
+
+
+def test_version_change_re_renders():
+    generator = CountingWhitePaper()
+    cache = WhitePaperContentCache(generator)
+    first = cache.get("section:abstract")
+    cache.get("json")
+
+    generator.version = "2.0"
+    assert cache.get("section:abstract") is not first
+    assert json.loads(cache.get("toc").body)["version"] == "2.0"
+    assert generator.calls.count("generate_complete_whitepaper") == 2